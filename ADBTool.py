@@ -12,6 +12,102 @@ import os
 from datetime import datetime
 import shlex
 import sys
+import asyncio
+import functools
+import itertools
+import json
+import shutil
+import time
+import threading
+import re
+from collections import deque
+
+# Output markers, compiled once; adb prints "no devices" right at the start of its error output
+_NO_DEV = re.compile(r"no devices", re.I)
+_NO_DEV_WINDOW = 256
+_SUCCESS = re.compile(r"success", re.I)
+_FAILED = re.compile(r"failed", re.I)
+_NOT_FOUND = re.compile(r"not found", re.I)
+# One `adb devices` row: "<serial>\t<state>"
+_DEV_RE = re.compile(r"^(\S+)\t(\w+)")
+
+# Static formatter results, built once
+_NO_DEV_MSG = "No devices connected!"
+_INSTALL_OK = "Installation Successful!\n\nCommand run: \"adb install <APK_PATH>\""
+_UNINSTALL_OK = "Uninstallation Successful!"
+
+# Separator echoed between batched getprop calls
+_GETPROP_SEP = "\x1e"
+
+# Marker echoed (followed by the exit status) after each command sent to the persistent adb shell
+_SHELL_DONE = "__ADBTOOL_DONE__"
+# Seconds a command on the persistent shell may run before the shell is killed
+_SHELL_TIMEOUT = 300
+
+# How often the attached-device list is refreshed in the background
+_DEVICE_POLL_MS = 3000
+
+# Read-only query results (adb devices, device info) are reused for this long
+_CMD_CACHE_TTL = 2.0  # seconds
+
+# Verified adb path is remembered here between launches
+_ADB_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".adbtool_cache.json")
+_ADB_CACHE_MAX_AGE = 24 * 60 * 60  # seconds
+
+
+def _is_executable_file(path):
+    # os.access alone also accepts directories
+    return os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_adb(adb_path):
+    """Return the usable adb executable for adb_path, or None if not found."""
+    # A recent launch already verified this path: skip the probe if it is still executable
+    try:
+        with open(_ADB_CACHE_FILE) as f:
+            cache = json.load(f)
+        if (cache.get("adb_path") == adb_path
+                and time.time() - cache.get("timestamp", 0) < _ADB_CACHE_MAX_AGE
+                and _is_executable_file(cache.get("resolved", ""))):
+            return cache["resolved"]
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    if os.path.isabs(adb_path):
+        resolved = adb_path if _is_executable_file(adb_path) else None
+    else:
+        resolved = shutil.which(adb_path)
+
+    if resolved:
+        try:
+            with open(_ADB_CACHE_FILE, "w") as f:
+                json.dump({"adb_path": adb_path, "resolved": resolved, "timestamp": time.time()}, f)
+        except OSError:
+            pass
+    return resolved
+
+
+def _status_formatter(message, command):
+    """Build a formatter method that returns a fixed status message (or the no-devices error)."""
+    result = f"{message}\n\nCommand run: \"{command}\""
+
+    def format_output(self, output):
+        return _NO_DEV_MSG if _NO_DEV.search(output, 0, _NO_DEV_WINDOW) else result
+    return format_output
+
+
+def require_device(handler):
+    """Decorator: show "No devices connected!" without spawning adb when the poll sees no device."""
+    @functools.wraps(handler)
+    def wrapper(self, *args, **kwargs):
+        # None means the device list is not known yet, so let adb report for itself
+        if self._devices is not None and not self._devices:
+            self._show_error("No devices connected!")
+            return
+        return handler(self, *args, **kwargs)
+    return wrapper
+
 
 # Optional: install ttkbootstrap for a modern theme:
 # pip install ttkbootstrap
@@ -34,6 +130,24 @@ class ADBTool:
         default_font = ("Helvetica", 16)
         self.root.option_add("*Font", default_font)
 
+        # Oldest output lines are dropped beyond this many
+        self.max_output_lines = 5000
+
+        # All adb processes run on one asyncio loop in a background thread, never on the Tk thread
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+
+        # Long-lived `adb shell` for quick shell commands, started on first use
+        self._shell = None
+        self._shell_lock = asyncio.Lock()
+
+        # Serials from the background `adb devices` poll (None until the first poll returns)
+        self._devices = None
+        self._poll_job = None
+
+        # command line -> (time.monotonic() stamp, CompletedProcess) for read-only queries
+        self._cmd_cache = {}
+
         # Check if ADB is available
         if not self.check_adb():
             messagebox.showerror(
@@ -60,161 +174,315 @@ class ADBTool:
         # Build controls (buttons + entries)
         self.create_controls()
 
-        # Output text box with scrollbar
-        self.output_text = tk.Text(self.output_frame, wrap="word", height=10)
-        self.output_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0,0), pady=(6,0))
-
-        vsb = ttk.Scrollbar(self.output_frame, orient="vertical", command=self.output_text.yview)
+        # Output log: a Listbox only draws its visible rows, so huge outputs stay cheap to render.
+        # output_lines mirrors its rows; _output_row_open means the last row has no newline yet.
+        self.output_lines = deque(maxlen=self.max_output_lines)
+        self._output_row_open = False
+        self.output_list = tk.Listbox(self.output_frame, height=10, activestyle="none")
+        vsb = ttk.Scrollbar(self.output_frame, orient="vertical", command=self.output_list.yview)
+        hsb = ttk.Scrollbar(self.output_frame, orient="horizontal", command=self.output_list.xview)
+        self.output_list.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        hsb.pack(side=tk.BOTTOM, fill=tk.X)
+        self.output_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0,0), pady=(6,0))
         vsb.pack(side=tk.RIGHT, fill=tk.Y)
-        self.output_text.configure(yscrollcommand=vsb.set)
 
         # Insert a short welcome message
-        self.output_text.insert(tk.END, "ADB Tool ready. Click 'List Devices' to begin.\n")
+        self._append_output("ADB Tool ready. Click 'List Devices' to begin.\n")
 
-    def check_adb(self):
-        """Check if ADB is available in PATH (macOS-friendly)"""
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._poll_devices()
+
+    def _poll_devices(self):
+        """Refresh the cached device list on the asyncio loop."""
+        self._poll_job = None
+        self._submit_coro(self._cached_exec([self.adb_path, "devices"]), self._update_devices)
+
+    def _update_devices(self, future):
+        """Store the polled device serials and schedule the next poll (runs on the Tk thread)."""
+        try:
+            output = future.result().stdout
+        except Exception:
+            self._devices = None
+        else:
+            self._devices = [m[1] for m in map(_DEV_RE.match, itertools.islice(output.splitlines(), 1, None)) if m]
+        self._poll_job = self.root.after(_DEVICE_POLL_MS, self._poll_devices)
+
+    def _invalidate_devices(self):
+        """Forget the cached device list after something that may change it, and re-poll now."""
+        self._devices = None
+        self._cmd_cache.clear()
+        if self._poll_job is not None:
+            # otherwise a poll is already in flight and will refresh the list
+            self.root.after_cancel(self._poll_job)
+            self._poll_devices()
+
+    def _on_close(self):
+        """Close the persistent adb shell and stop the asyncio loop, then the window."""
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
         try:
-            # prefer using `which adb` to ensure path presence on mac
-            which = subprocess.run(["which", self.adb_path], capture_output=True, text=True)
-            if which.returncode != 0 or not which.stdout.strip():
-                return False
-            result = subprocess.run([self.adb_path, "--version"], capture_output=True, text=True)
-            return result.returncode == 0
+            asyncio.run_coroutine_threadsafe(self._close_shell(), self._loop).result(timeout=1)
         except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self.root.destroy()
+
+    async def _close_shell(self):
+        shell = self._shell
+        if shell is not None and shell.returncode is None:
+            try:
+                shell.stdin.write(b"exit\n")
+                await shell.stdin.drain()
+            except OSError:
+                shell.kill()
+
+    def check_adb(self):
+        """Check if ADB is available (absolute path or on PATH, memoized across launches)"""
+        resolved = _resolve_adb(self.adb_path)
+        if not resolved:
             return False
+        self.adb_path = resolved
+        return True
+
+    def _submit_coro(self, coro, callback, *args):
+        """Schedule coro on the asyncio loop; callback(future, *args) later runs on the Tk thread."""
+        fut = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        fut.add_done_callback(lambda f: self.root.after(0, callback, f, *args))
+
+    @staticmethod
+    async def _exec(argv, check=False):
+        """Run argv (no shell) and collect its output as a CompletedProcess."""
+        process = await asyncio.create_subprocess_exec(
+            *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        result = subprocess.CompletedProcess(
+            argv, process.returncode,
+            stdout.decode(errors="replace"), stderr.decode(errors="replace")
+        )
+        if check:
+            result.check_returncode()
+        return result
+
+    async def _cached_exec(self, argv, check=False):
+        """_exec for read-only queries, memoized for _CMD_CACHE_TTL seconds."""
+        key = " ".join(argv)
+        hit = self._cmd_cache.get(key)
+        if hit is not None and time.monotonic() - hit[0] < _CMD_CACHE_TTL:
+            return hit[1]
+        result = await self._exec(argv, check=check)
+        self._cmd_cache[key] = (time.monotonic(), result)
+        return result
 
     def run_single_adb_command(self, command, format_output_func):
-        """Execute ADB command and display formatted result."""
-        command = command.replace("adb", self.adb_path)
+        """Execute a user-typed ADB command string (under /bin/sh) and display formatted result."""
+        if command == "adb" or command.startswith("adb "):
+            command = shlex.quote(self.adb_path) + command[3:]
+        # free-form input may contain pipes/redirects, so this is the one path still run under shell
+        self._submit_coro(self._exec_shell_string(command), self._deliver, format_output_func)
+
+    @staticmethod
+    async def _exec_shell_string(command):
+        process = await asyncio.create_subprocess_shell(
+            command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        return subprocess.CompletedProcess(
+            command, process.returncode,
+            stdout.decode(errors="replace"), stderr.decode(errors="replace")
+        )
+
+    def _run_argv(self, argv, format_output_func, cached=False):
+        """Execute an ADB argv list directly (no shell) and display formatted result.
+
+        With cached=True a result younger than _CMD_CACHE_TTL is reused instead of re-running adb.
+        """
+        coro = self._cached_exec(argv) if cached else self._exec(argv)
+        self._submit_coro(coro, self._deliver, format_output_func)
+
+    @require_device
+    def _run_guarded(self, runner, argv, format_output_func):
+        """Run a fixed-command button through runner once a device is attached."""
+        runner(argv, format_output_func)
+        if argv[1] == "reboot":
+            self._invalidate_devices()
+
+    def _run_shell(self, argv, format_output_func):
+        """Execute an `adb shell ...` argv list through the persistent shell and display formatted result."""
+        self._submit_coro(self._shell_exec(argv), self._deliver, format_output_func)
+
+    async def _shell_exec(self, argv):
+        """Run argv's shell part in the long-lived adb shell.
+
+        Falls back to a one-shot subprocess if the shell cannot be written to.
+        Raises subprocess.TimeoutExpired if the command runs longer than _SHELL_TIMEOUT seconds.
+        """
+        # quoted here, so callers pass plain arguments
+        line = shlex.join(argv[2:])
+        async with self._shell_lock:
+            try:
+                if self._shell is None or self._shell.returncode is not None:
+                    self._shell = await asyncio.create_subprocess_exec(
+                        self.adb_path, "shell",
+                        stdin=asyncio.subprocess.PIPE,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.STDOUT
+                    )
+                # on its own line, so output without a trailing newline can't swallow the echo
+                self._shell.stdin.write(f"{line}\necho {_SHELL_DONE}$?\n".encode())
+                await self._shell.stdin.drain()
+            except OSError:
+                self._shell = None
+                return await self._exec([argv[0], "shell", line])
+
+            try:
+                output, status = await asyncio.wait_for(self._read_shell_output(), _SHELL_TIMEOUT)
+            except asyncio.TimeoutError:
+                # the marker never came; a fresh shell is spawned for the next command
+                self._shell.kill()
+                await self._shell.wait()
+                self._shell = None
+                raise subprocess.TimeoutExpired(line, _SHELL_TIMEOUT) from None
+        return subprocess.CompletedProcess(argv, status, stdout=output, stderr="")
+
+    async def _read_shell_output(self):
+        """Read the shell's output up to _SHELL_DONE; returns (output, exit status)."""
+        output = []
+        while True:
+            out_line = (await self._shell.stdout.readline()).decode(errors="replace")
+            if not out_line:
+                # EOF before the marker: the shell exited (e.g. no device); respawn next time
+                await self._shell.wait()
+                self._shell = None
+                return "".join(output), None
+            # output without a trailing newline runs straight into the marker
+            head, found, status = out_line.partition(_SHELL_DONE)
+            if head:
+                output.append(head)
+            if found:
+                return "".join(output), int(status.strip() or 0)
+
+    def _run_streaming(self, argv, format_output_func):
+        """Execute an ADB argv list, showing its output live, then append the formatted result."""
+        # install/sideload/push/pull change device state
+        self._cmd_cache.clear()
+        self._clear_output()
+        asyncio.run_coroutine_threadsafe(self._stream(argv, format_output_func), self._loop)
+
+    async def _stream(self, argv, format_output_func):
+        """Forward a child's output to the output box line by line."""
+        lines = []
         try:
-            self.output_text.delete(1.0, tk.END)
-            # if command is a string and includes pipes/redirects, run under shell
-            # For safety, prefer list if possible. Many commands include pipes; keep shell=True but use shlex for repr
-            process = subprocess.run(command, capture_output=True, text=True, shell=True)
+            process = await asyncio.create_subprocess_exec(
+                *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+            )
+            async for raw in process.stdout:
+                line = raw.decode(errors="replace")
+                lines.append(line)
+                self.root.after(0, self._append_output, line)
+            await process.wait()
+            formatted_output = format_output_func("".join(lines))
+        except Exception as e:
+            formatted_output = f"Error: {str(e)}"
+        self.root.after(0, self._append_output, "\n" + formatted_output)
+
+    @staticmethod
+    def _grep(output, pattern, ignore_case=False):
+        """Python stand-in for `| grep pattern`; adb's own "no devices" error line is kept."""
+        if ignore_case:
+            pattern = pattern.lower()
+            return "\n".join(ln for ln in output.splitlines()
+                             if pattern in ln.lower() or _NO_DEV.search(ln))
+        return "\n".join(ln for ln in output.splitlines()
+                         if pattern in ln or _NO_DEV.search(ln))
+
+    def _deliver(self, future, format_output_func):
+        """Display the result of a finished command (runs on the Tk thread)."""
+        self._clear_output()
+        try:
+            process = future.result()
             output = (process.stdout or "") + (process.stderr or "")
             formatted_output = format_output_func(output)
-            self.output_text.insert(tk.END, formatted_output)
+            self._append_output(formatted_output)
         except Exception as e:
-            self.output_text.insert(tk.END, f"Error: {str(e)}")
+            self._append_output(f"Error: {str(e)}")
 
     """ --------------------- Formatters --------------------- """
 
     def format_devices(self, output):
-        lines = [ln for ln in output.splitlines() if ln.strip()]
         # Expect header + devices; adb devices on mac prints "List of devices attached" then lines
-        if not lines or all("device" not in ln for ln in lines[1:]):
-            return "No devices connected!\n\nCommand run: \"adb devices\""
         devices = []
-        for ln in lines[1:]:
-            devices.append(ln.replace("\tdevice", " → Connected"))
+        for ln in itertools.islice(output.splitlines(), 1, None):
+            m = _DEV_RE.match(ln)
+            if m:
+                devices.append(f"{m[1]} → {'Connected' if m[2] == 'device' else m[2].title()}")
+        if not devices:
+            return "No devices connected!\n\nCommand run: \"adb devices\""
         return "\n".join(devices) + "\n\nCommand run: \"adb devices\""
 
     def format_install(self, output):
-        if "Success" in output or "success" in output.lower():
-            return "Installation Successful!\n\nCommand run: \"adb install <APK_PATH>\""
-        if "no devices" in output.lower():
-            return "No devices connected!"
+        if _SUCCESS.search(output):
+            return _INSTALL_OK
+        if _NO_DEV.search(output, 0, _NO_DEV_WINDOW):
+            return _NO_DEV_MSG
         return f"Installation Result:\n{output}\n\nCommand run: \"adb install <APK_PATH>\""
 
     def format_search(self, output):
         if not output.strip():
             return "No package found!\n\nCommand run: \"adb shell pm list packages | grep <PACKAGE_NAME>\""
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        # output lines like "package:com.example.app"
-        return "\n".join([ln.replace("package:", "") for ln in output.splitlines() if ln.strip()]) + \
+        if _NO_DEV.search(output, 0, _NO_DEV_WINDOW):
+            return _NO_DEV_MSG
+        # output lines like "package:com.example.app"; slice the prefix off instead of replacing it
+        return "\n".join(ln[8:] if ln.startswith("package:") else ln for ln in output.splitlines() if ln.strip()) + \
                "\n\nCommand run: \"adb shell pm list packages | grep <PACKAGE_NAME>\""
 
     def format_uninstall(self, output):
-        if "Success" in output or "success" in output.lower():
-            return "Uninstallation Successful!"
-        if "no devices" in output.lower():
-            return "No devices connected!"
+        if _SUCCESS.search(output):
+            return _UNINSTALL_OK
+        if _NO_DEV.search(output, 0, _NO_DEV_WINDOW):
+            return _NO_DEV_MSG
         return f"Uninstallation Result:\n{output}\n\nCommand run: \"adb uninstall <PACKAGE_NAME>\""
 
     def format_sideload(self, output):
-        if "failed" in output.lower():
+        if _FAILED.search(output):
             return "Make sure the device is in sideload mode and try again.\n(Select \"Apply update from ADB\" in Recovery Mode)\n\n" + output
         return f"Sideloading Finished. (Check output below.)\n\n{output}\n\nCommand run: \"adb sideload <FIRMWARE_PATH>.zip\""
 
-    def format_shutdown(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Shutdown initiated\n\nCommand run: \"adb reboot -p\""
-
-    def format_recovery(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Recovery initiated\n\nCommand run: \"adb reboot recovery\""
-
-    def format_reboot(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Reboot initiated\n\nCommand run: \"adb reboot\""
-
-    def format_back(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Back command executed\n\nCommand run: \"adb shell input keyevent 4\""
-
-    def format_home(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Home command executed\n\nCommand run: \"adb shell input keyevent 3\""
-
-    def format_applications(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Applications command executed\n\nCommand run: \"adb shell input keyevent 187\""
-
-    def format_volume_up(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Volume Up command executed\n\nCommand run: \"adb shell input keyevent 24\""
-
-    def format_power(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Power (Lock/Unlock) command executed\n\nCommand run: \"adb shell input keyevent 26\""
-
-    def format_volume_down(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Volume Down command executed\n\nCommand run: \"adb shell input keyevent 25\""
-
-    def format_settings(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Settings command executed\n\nCommand run: \"adb shell am start -n com.android.settings/.Settings\""
-
-    def format_factory_test(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Factory Test command executed\n\nCommand run: \"adb shell am start -n com.ubx.factorykit/.Framework.Framework\""
+    format_shutdown = _status_formatter("Shutdown initiated", "adb reboot -p")
+    format_recovery = _status_formatter("Recovery initiated", "adb reboot recovery")
+    format_reboot = _status_formatter("Reboot initiated", "adb reboot")
+    format_back = _status_formatter("Back command executed", "adb shell input keyevent 4")
+    format_home = _status_formatter("Home command executed", "adb shell input keyevent 3")
+    format_applications = _status_formatter("Applications command executed", "adb shell input keyevent 187")
+    format_volume_up = _status_formatter("Volume Up command executed", "adb shell input keyevent 24")
+    format_power = _status_formatter("Power (Lock/Unlock) command executed", "adb shell input keyevent 26")
+    format_volume_down = _status_formatter("Volume Down command executed", "adb shell input keyevent 25")
+    format_settings = _status_formatter("Settings command executed", "adb shell am start -n com.android.settings/.Settings")
+    format_factory_test = _status_formatter("Factory Test command executed", "adb shell am start -n com.ubx.factorykit/.Framework.Framework")
 
     def format_push(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        if "failed" in output.lower():
+        if _NO_DEV.search(output, 0, _NO_DEV_WINDOW):
+            return _NO_DEV_MSG
+        if _FAILED.search(output):
             return "Push failed. Check the local and device paths.\n\n" + output
         return f"File pushed successfully:\n{output}\n\nCommand run: \"adb push <LOCAL_PATH> <DEVICE_PATH>\""
 
     def format_storage(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
+        if _NO_DEV.search(output, 0, _NO_DEV_WINDOW):
+            return _NO_DEV_MSG
         return f"Device Storage:\n{output}\n\nCommand run: \"adb shell ls -l <DEVICE_PATH>\""
 
     def format_pull(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        if "failed" in output.lower():
+        if _NO_DEV.search(output, 0, _NO_DEV_WINDOW):
+            return _NO_DEV_MSG
+        if _FAILED.search(output):
             return "Pull failed. Check the device and local paths.\n\n" + output
         return f"File pulled successfully:\n{output}\n\nCommand run: \"adb pull <DEVICE_PATH> <LOCAL_PATH>\""
 
     def format_screenshot(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        if "failed" in output.lower():
+        if _NO_DEV.search(output, 0, _NO_DEV_WINDOW):
+            return _NO_DEV_MSG
+        if _FAILED.search(output):
             return "Screenshot failed. Check the device state.\n\n" + output
         return (
             f"Screenshot saved on device under /sdcard/Pictures/Screenshot_*.png\n"
@@ -223,44 +491,40 @@ class ADBTool:
         )
 
     def format_network(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
+        if _NO_DEV.search(output, 0, _NO_DEV_WINDOW):
+            return _NO_DEV_MSG
         if not output.strip():
             return "Network check returned no output. Device might be offline or command unsupported."
         return f"Network configuration:\n{output}\n\nCommand run: \"adb shell ifconfig\""
 
     def format_activity(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        if "mCurrentFocus" not in output and "mFocusedApp" not in output:
-            return "No current activity found. Output:\n" + output
-        # try to extract the focused activity line:
+        if _NO_DEV.search(output, 0, _NO_DEV_WINDOW):
+            return _NO_DEV_MSG
+        # extract the focused activity line in a single scan
         for ln in output.splitlines():
             if "mCurrentFocus" in ln or "mFocusedApp" in ln:
                 return f"Current focus:\n{ln.strip()}\n\nCommand run: \"adb shell dumpsys window | grep mCurrentFocus\""
-        return "Current activity (raw output):\n" + output
+        return "No current activity found. Output:\n" + output
 
-    def format_text(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Text entered.\n\nCommand run: \"adb shell input text <TEXT>\""
+    format_text = _status_formatter("Text entered.", "adb shell input text <TEXT>")
 
     def format_command(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
+        if _NO_DEV.search(output, 0, _NO_DEV_WINDOW):
+            return _NO_DEV_MSG
         return output
 
     def format_start_activity(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        if "Error" in output or "not found" in output.lower():
+        if _NO_DEV.search(output, 0, _NO_DEV_WINDOW):
+            return _NO_DEV_MSG
+        if "Error" in output or _NOT_FOUND.search(output):
             return "Failed to start activity. Check the package/activity name.\n\n" + output
         return f"Activity started (or adb returned output):\n{output}\n\nCommand run: \"adb shell am start -n <PACKAGE_NAME>/<ACTIVITY_NAME>\""
 
     """ --------------------- Commands (button handlers) --------------------- """
 
+    @require_device
     def run_adb_command_device_info(self):
-        # list of properties to query; run them one by one
+        # list of properties to query
         props = [
             ("persist.sys.product.model", "Model Number"),
             ("pwv.project", "Project"),
@@ -271,18 +535,26 @@ class ADBTool:
             ("ro.build.version.sdk", "SDK(API) version")
         ]
 
-        self.output_text.delete(1.0, tk.END)
-        results = []
-        for prop, _label in props:
-            try:
-                r = subprocess.run([self.adb_path, "shell", "getprop", prop], capture_output=True, text=True, check=True)
-                results.append(r.stdout.strip() or "N/A")
-            except subprocess.CalledProcessError:
-                self.output_text.insert(tk.END, "No devices connected!\n")
-                return
-            except Exception as e:
-                self.output_text.insert(tk.END, f"Error running adb: {e}\n")
-                return
+        # query every property in one adb shell call, separated by a record-separator line
+        script = f" ; echo '{_GETPROP_SEP}' ; ".join(f"getprop {prop}" for prop, _label in props)
+        self._submit_coro(self._cached_exec([self.adb_path, "shell", script], check=True),
+                          self._deliver_device_info, props)
+
+    def _deliver_device_info(self, future, props):
+        """Build the device info report from the batched getprop call (runs on the Tk thread)."""
+        self._clear_output()
+        try:
+            r = future.result()
+        except subprocess.CalledProcessError:
+            self._append_output("No devices connected!\n")
+            return
+        except Exception as e:
+            self._append_output(f"Error running adb: {e}\n")
+            return
+        results = [value.strip() or "N/A" for value in r.stdout.split(_GETPROP_SEP)]
+        if len(results) != len(props):
+            self._append_output(f"Error running adb: unexpected getprop output\n{r.stdout}\n")
+            return
 
         # build output
         output_lines = ["Device Information:"]
@@ -294,53 +566,57 @@ class ADBTool:
         output_lines.append(f"{props[5][1]}: {results[5]}")
         output_lines.append(f"{props[6][1]}: {results[6]}")
 
-        self.output_text.insert(tk.END, "\n".join(output_lines) + "\n\nCommand run: \"adb shell getprop <property>\"")
+        self._append_output("\n".join(output_lines) + "\n\nCommand run: \"adb shell getprop <property>\"")
 
+    @require_device
     def run_install_apk(self):
         apk_path = self.install_apk_entry.get().strip()
         if not apk_path:
             self._show_error("Please enter a valid APK path")
             return
         apk_path = os.path.expanduser(apk_path)
-        if not os.path.isfile(apk_path) or not apk_path.lower().endswith(".apk"):
+        # check the extension first so a wrong path never costs a stat()
+        if os.path.splitext(apk_path)[1].lower() != ".apk" or not os.path.isfile(apk_path):
             self._show_error("Please enter a valid APK path (file must exist and end with .apk)")
             return
-        cmd = f'adb install "{apk_path}"'
-        self.run_single_adb_command(cmd, self.format_install)
+        self._run_streaming([self.adb_path, "install", apk_path], self.format_install)
 
+    @require_device
     def run_search_apk(self):
         apk_name = self.search_apk_entry.get().strip()
         if not apk_name:
             self._show_error("Please enter a valid APK/package name fragment")
             return
-        # use grep (macOS/Unix), case-insensitive
-        cmd = f'adb shell pm list packages | grep -i "{apk_name}"'
-        self.run_single_adb_command(cmd, self.format_search)
+        # case-insensitive grep done in Python on the package list
+        self._run_argv([self.adb_path, "shell", "pm", "list", "packages"],
+                       lambda out: self.format_search(self._grep(out, apk_name, ignore_case=True)))
 
+    @require_device
     def run_uninstall_apk(self):
         apk_name = self.uninstall_apk_entry.get().strip()
         if not apk_name or "com." not in apk_name:
             self._show_error("Please enter a valid package name (e.g. com.example.app)")
             return
-        cmd = f'adb uninstall "{apk_name}"'
-        self.run_single_adb_command(cmd, self.format_uninstall)
+        self._cmd_cache.clear()
+        self._run_argv([self.adb_path, "uninstall", apk_name], self.format_uninstall)
 
+    @require_device
     def run_sideload_firmware(self):
         firmware_path = os.path.expanduser(self.sideload_apk_entry.get().strip())
-        if not firmware_path or not os.path.isfile(firmware_path) or not firmware_path.lower().endswith(".zip"):
+        if not firmware_path or os.path.splitext(firmware_path)[1].lower() != ".zip" or not os.path.isfile(firmware_path):
             self._show_error("Please enter a valid firmware path (.zip)")
             return
-        cmd = f'adb sideload "{firmware_path}"'
-        self.run_single_adb_command(cmd, self.format_sideload)
+        self._run_streaming([self.adb_path, "sideload", firmware_path], self.format_sideload)
 
+    @require_device
     def run_check_storage(self):
         path = self.device_storage_entry.get().strip()
         if not path or not path.startswith("/sdcard/"):
             self._show_error("Please enter a valid device storage path (starting with /sdcard/)")
             return
-        cmd = f'adb shell ls -l "{path}"'
-        self.run_single_adb_command(cmd, self.format_storage)
+        self._run_argv([self.adb_path, "shell", "ls", "-l", path], self.format_storage)
 
+    @require_device
     def run_adb_push(self):
         local_path = os.path.expanduser(self.push_local_entry.get().strip())
         device_path = self.push_device_entry.get().strip()
@@ -352,9 +628,9 @@ class ADBTool:
             self._show_error("Please enter a valid device path (starting with /sdcard/)")
             return
 
-        cmd = f'adb push "{local_path}" "{device_path}"'
-        self.run_single_adb_command(cmd, self.format_push)
+        self._run_streaming([self.adb_path, "push", local_path, device_path], self.format_push)
 
+    @require_device
     def run_adb_pull(self):
         device_path = self.pull_device_entry.get().strip()
         local_path = os.path.expanduser(self.pull_local_entry.get().strip())
@@ -366,18 +642,16 @@ class ADBTool:
             self._show_error("Please enter a valid local path")
             return
 
-        cmd = f'adb pull "{device_path}" "{local_path}"'
-        self.run_single_adb_command(cmd, self.format_pull)
+        self._run_streaming([self.adb_path, "pull", device_path, local_path], self.format_pull)
 
+    @require_device
     def run_text_input(self):
         text = self.text_input_entry.get().strip()
         if not text:
             self._show_error("Please enter some text")
             return
-        # escape spaces for adb shell input text; adb expects certain escaping
-        safe_text = text.replace('"', '\\"')
-        cmd = f'adb shell input text "{safe_text}"'
-        self.run_single_adb_command(cmd, self.format_text)
+        # quote for the device-side shell so spaces/quotes survive as one argument
+        self._run_shell([self.adb_path, "shell", "input", "text", text], self.format_text)
 
     def run_execute_command(self):
         command = self.text_input_entry.get().strip()
@@ -386,18 +660,60 @@ class ADBTool:
             return
         # run exactly what user entered (assume adb shell commands or adb ...)
         self.run_single_adb_command(command, self.format_command)
+        # free-form commands may connect/disconnect devices
+        self._invalidate_devices()
 
+    @require_device
     def run_start_activity(self):
         activity = self.start_activity_entry.get().strip()
         if not activity:
             self._show_error("Please enter a valid Package/Activity (e.g. com.example/.MainActivity)")
             return
-        cmd = f'adb shell am start -n "{activity}"'
-        self.run_single_adb_command(cmd, self.format_start_activity)
+        self._run_argv([self.adb_path, "shell", "am", "start", "-n", activity], self.format_start_activity)
+
+    @require_device
+    def run_check_activity(self):
+        # grep for mCurrentFocus in Python rather than through a host shell pipeline
+        self._run_argv([self.adb_path, "shell", "dumpsys", "window"],
+                       lambda out: self.format_activity(self._grep(out, "mCurrentFocus")))
+
+    @require_device
+    def run_screenshot(self):
+        # timestamp taken per click so each screenshot gets its own file
+        ts = datetime.now().strftime("%Y%m%d%H%M%S")
+        self._run_argv([self.adb_path, "shell", "screencap", "-p", f"/sdcard/Pictures/Screenshot_{ts}.png"],
+                       self.format_screenshot)
+
+    def _append_output(self, text):
+        """Append text to the output log, dropping the oldest rows past max_output_lines."""
+        rows = text.split("\n")
+        ends_open = rows[-1] != ""
+        if not ends_open:
+            rows.pop()
+        if self._output_row_open and self.output_lines and rows:
+            # continue the unfinished last row
+            rows[0] = self.output_lines.pop() + rows[0]
+            self.output_list.delete(tk.END)
+        self._output_row_open = ends_open
+        rows = rows[-self.max_output_lines:]
+        if not rows:
+            return
+
+        overflow = len(self.output_lines) + len(rows) - self.max_output_lines
+        self.output_lines.extend(rows)
+        self.output_list.insert(tk.END, *rows)
+        if overflow > 0:
+            self.output_list.delete(0, overflow - 1)
+        self.output_list.see(tk.END)
+
+    def _clear_output(self):
+        self.output_lines.clear()
+        self._output_row_open = False
+        self.output_list.delete(0, tk.END)
 
     def _show_error(self, msg):
-        self.output_text.delete(1.0, tk.END)
-        self.output_text.insert(tk.END, f"Error: {msg}\n")
+        self._clear_output()
+        self._append_output(f"Error: {msg}\n")
 
     """ --------------------- Build Controls UI --------------------- """
 
@@ -405,11 +721,35 @@ class ADBTool:
         # We'll build a grid of controls with sensible spacing.
         outer = self.controls_frame
 
+        # Fixed-command buttons: argv + formatter prepared once, bound below with functools.partial
+        adb = self.adb_path
+        self._key_cmds = {
+            "List Devices": ([adb, "devices"], self.format_devices),
+            "Shutdown": ([adb, "reboot", "-p"], self.format_shutdown),
+            "Recovery Mode": ([adb, "reboot", "recovery"], self.format_recovery),
+            "Reboot": ([adb, "reboot"], self.format_reboot),
+            "Back": ([adb, "shell", "input", "keyevent", "4"], self.format_back),
+            "Home": ([adb, "shell", "input", "keyevent", "3"], self.format_home),
+            "Applications": ([adb, "shell", "input", "keyevent", "187"], self.format_applications),
+            "Volume Up": ([adb, "shell", "input", "keyevent", "24"], self.format_volume_up),
+            "Lock/Unlock": ([adb, "shell", "input", "keyevent", "26"], self.format_power),
+            "Volume Down": ([adb, "shell", "input", "keyevent", "25"], self.format_volume_down),
+            "Settings": ([adb, "shell", "am", "start", "-n", "com.android.settings/.Settings"], self.format_settings),
+            "Factory Test": ([adb, "shell", "am", "start", "-n", "com.ubx.factorykit/.Framework.Framework"], self.format_factory_test),
+            "Check Network": ([adb, "shell", "ifconfig"], self.format_network),
+        }
+
+        def key(name):
+            argv, format_output_func = self._key_cmds[name]
+            # shell commands go through the persistent adb shell
+            runner = self._run_shell if argv[1] == "shell" else self._run_argv
+            return functools.partial(self._run_guarded, runner, argv, format_output_func)
+
         # Top row: device info & list devices
         top_row = ttk.Frame(outer)
         top_row.pack(fill=tk.X, pady=(4,8))
         ttk.Button(top_row, text="Get Device Info", width=18, command=self.run_adb_command_device_info).pack(side=tk.LEFT, padx=6)
-        ttk.Button(top_row, text="List Devices", width=18, command=lambda: self.run_single_adb_command("adb devices", self.format_devices)).pack(side=tk.LEFT, padx=6)
+        ttk.Button(top_row, text="List Devices", width=18, command=functools.partial(self._run_argv, *self._key_cmds["List Devices"], cached=True)).pack(side=tk.LEFT, padx=6)
 
         # Row: Install APK
         install_row = ttk.Frame(outer)
@@ -417,6 +757,7 @@ class ADBTool:
         desktop_default = os.path.join(os.path.expanduser("~"), "Desktop")
         self.install_apk_entry = ttk.Entry(install_row, width=86)
         self.install_apk_entry.pack(side=tk.LEFT, padx=(6,4))
+        self.install_apk_entry.bind("<Return>", lambda e: self.run_install_apk())
         self.install_apk_entry.insert(0, desktop_default + os.sep)
         ttk.Button(install_row, text="Install APK", width=18, command=self.run_install_apk).pack(side=tk.LEFT, padx=6)
 
@@ -425,10 +766,12 @@ class ADBTool:
         search_row.pack(fill=tk.X, pady=4)
         self.search_apk_entry = ttk.Entry(search_row, width=54)
         self.search_apk_entry.pack(side=tk.LEFT, padx=(6,4))
+        self.search_apk_entry.bind("<Return>", lambda e: self.run_search_apk())
         ttk.Button(search_row, text="Search APK", width=18, command=self.run_search_apk).pack(side=tk.LEFT, padx=6)
 
         self.uninstall_apk_entry = ttk.Entry(search_row, width=54)
         self.uninstall_apk_entry.pack(side=tk.LEFT, padx=(12,4))
+        self.uninstall_apk_entry.bind("<Return>", lambda e: self.run_uninstall_apk())
         ttk.Button(search_row, text="Uninstall APK", width=18, command=self.run_uninstall_apk).pack(side=tk.LEFT, padx=6)
 
         # Row: Sideload
@@ -436,37 +779,39 @@ class ADBTool:
         sideload_row.pack(fill=tk.X, pady=4)
         self.sideload_apk_entry = ttk.Entry(sideload_row, width=86)
         self.sideload_apk_entry.pack(side=tk.LEFT, padx=(6,4))
+        self.sideload_apk_entry.bind("<Return>", lambda e: self.run_sideload_firmware())
         self.sideload_apk_entry.insert(0, desktop_default + os.sep)
         ttk.Button(sideload_row, text="Sideload firmware", width=18, command=self.run_sideload_firmware).pack(side=tk.LEFT, padx=6)
 
         # Row: System control (shutdown/recovery/reboot)
         sys_row = ttk.Frame(outer)
         sys_row.pack(fill=tk.X, pady=4)
-        ttk.Button(sys_row, text="Shutdown", width=18, command=lambda: self.run_single_adb_command("adb reboot -p", self.format_shutdown)).pack(side=tk.LEFT, padx=10)
-        ttk.Button(sys_row, text="Recovery Mode", width=18, command=lambda: self.run_single_adb_command("adb reboot recovery", self.format_recovery)).pack(side=tk.LEFT, padx=10)
-        ttk.Button(sys_row, text="Reboot", width=18, command=lambda: self.run_single_adb_command("adb reboot", self.format_reboot)).pack(side=tk.LEFT, padx=10)
+        ttk.Button(sys_row, text="Shutdown", width=18, command=key("Shutdown")).pack(side=tk.LEFT, padx=10)
+        ttk.Button(sys_row, text="Recovery Mode", width=18, command=key("Recovery Mode")).pack(side=tk.LEFT, padx=10)
+        ttk.Button(sys_row, text="Reboot", width=18, command=key("Reboot")).pack(side=tk.LEFT, padx=10)
 
         # Row: Navigation/buttons
         nav_row = ttk.Frame(outer)
         nav_row.pack(fill=tk.X, pady=4)
-        ttk.Button(nav_row, text="Back", width=14, command=lambda: self.run_single_adb_command("adb shell input keyevent 4", self.format_back)).pack(side=tk.LEFT, padx=6)
-        ttk.Button(nav_row, text="Home", width=14, command=lambda: self.run_single_adb_command("adb shell input keyevent 3", self.format_home)).pack(side=tk.LEFT, padx=6)
-        ttk.Button(nav_row, text="Applications", width=14, command=lambda: self.run_single_adb_command("adb shell input keyevent 187", self.format_applications)).pack(side=tk.LEFT, padx=6)
-        ttk.Button(nav_row, text="Volume Up", width=14, command=lambda: self.run_single_adb_command("adb shell input keyevent 24", self.format_volume_up)).pack(side=tk.LEFT, padx=6)
-        ttk.Button(nav_row, text="Lock/Unlock", width=14, command=lambda: self.run_single_adb_command("adb shell input keyevent 26", self.format_power)).pack(side=tk.LEFT, padx=6)
-        ttk.Button(nav_row, text="Volume Down", width=14, command=lambda: self.run_single_adb_command("adb shell input keyevent 25", self.format_volume_down)).pack(side=tk.LEFT, padx=6)
+        ttk.Button(nav_row, text="Back", width=14, command=key("Back")).pack(side=tk.LEFT, padx=6)
+        ttk.Button(nav_row, text="Home", width=14, command=key("Home")).pack(side=tk.LEFT, padx=6)
+        ttk.Button(nav_row, text="Applications", width=14, command=key("Applications")).pack(side=tk.LEFT, padx=6)
+        ttk.Button(nav_row, text="Volume Up", width=14, command=key("Volume Up")).pack(side=tk.LEFT, padx=6)
+        ttk.Button(nav_row, text="Lock/Unlock", width=14, command=key("Lock/Unlock")).pack(side=tk.LEFT, padx=6)
+        ttk.Button(nav_row, text="Volume Down", width=14, command=key("Volume Down")).pack(side=tk.LEFT, padx=6)
 
         # Row: Settings / Factory
         srow = ttk.Frame(outer)
         srow.pack(fill=tk.X, pady=4)
-        ttk.Button(srow, text="Settings", width=20, command=lambda: self.run_single_adb_command("adb shell am start -n com.android.settings/.Settings", self.format_settings)).pack(side=tk.LEFT, padx=10)
-        ttk.Button(srow, text="Factory Test", width=20, command=lambda: self.run_single_adb_command("adb shell am start -n com.ubx.factorykit/.Framework.Framework", self.format_factory_test)).pack(side=tk.LEFT, padx=10)
+        ttk.Button(srow, text="Settings", width=20, command=key("Settings")).pack(side=tk.LEFT, padx=10)
+        ttk.Button(srow, text="Factory Test", width=20, command=key("Factory Test")).pack(side=tk.LEFT, padx=10)
 
         # Row: Storage check
         storage_row = ttk.Frame(outer)
         storage_row.pack(fill=tk.X, pady=4)
         self.device_storage_entry = ttk.Entry(storage_row, width=86)
         self.device_storage_entry.pack(side=tk.LEFT, padx=(6,4))
+        self.device_storage_entry.bind("<Return>", lambda e: self.run_check_storage())
         self.device_storage_entry.insert(0, "/sdcard/")
         ttk.Button(storage_row, text="Check Device Storage", width=18, command=self.run_check_storage).pack(side=tk.LEFT, padx=6)
 
@@ -475,10 +820,12 @@ class ADBTool:
         push_row.pack(fill=tk.X, pady=4)
         self.push_local_entry = ttk.Entry(push_row, width=44)
         self.push_local_entry.pack(side=tk.LEFT, padx=(6,4))
+        self.push_local_entry.bind("<Return>", lambda e: self.run_adb_push())
         self.push_local_entry.insert(0, desktop_default + os.sep)
         ttk.Label(push_row, text="→").pack(side=tk.LEFT, padx=6)
         self.push_device_entry = ttk.Entry(push_row, width=30)
         self.push_device_entry.pack(side=tk.LEFT, padx=6)
+        self.push_device_entry.bind("<Return>", lambda e: self.run_adb_push())
         self.push_device_entry.insert(0, "/sdcard/")
         ttk.Button(push_row, text="Push File to device", width=18, command=self.run_adb_push).pack(side=tk.LEFT, padx=8)
 
@@ -486,28 +833,28 @@ class ADBTool:
         pull_row.pack(fill=tk.X, pady=4)
         self.pull_local_entry = ttk.Entry(pull_row, width=44)
         self.pull_local_entry.pack(side=tk.LEFT, padx=(6,4))
+        self.pull_local_entry.bind("<Return>", lambda e: self.run_adb_pull())
         self.pull_local_entry.insert(0, desktop_default + os.sep)
         ttk.Label(pull_row, text="←").pack(side=tk.LEFT, padx=6)
         self.pull_device_entry = ttk.Entry(pull_row, width=30)
         self.pull_device_entry.pack(side=tk.LEFT, padx=6)
+        self.pull_device_entry.bind("<Return>", lambda e: self.run_adb_pull())
         self.pull_device_entry.insert(0, "/sdcard/")
         ttk.Button(pull_row, text="Pull File from device", width=18, command=self.run_adb_pull).pack(side=tk.LEFT, padx=8)
 
         # Row: Screen capture / Network / Activity
         capture_row = ttk.Frame(outer)
         capture_row.pack(fill=tk.X, pady=4)
-        ts = datetime.now().strftime("%Y%m%d%H%M%S")
-        screenshot_cmd = f'adb shell screencap -p /sdcard/Pictures/Screenshot_{ts}.png'
-        ttk.Button(capture_row, text="Screen Shot", width=18, command=lambda: self.run_single_adb_command(screenshot_cmd, self.format_screenshot)).pack(side=tk.LEFT, padx=10)
-        ttk.Button(capture_row, text="Check Network", width=18, command=lambda: self.run_single_adb_command("adb shell ifconfig", self.format_network)).pack(side=tk.LEFT, padx=10)
-        # on unix use grep for mCurrentFocus
-        ttk.Button(capture_row, text="Check Activity", width=18, command=lambda: self.run_single_adb_command("adb shell dumpsys window | grep mCurrentFocus", self.format_activity)).pack(side=tk.LEFT, padx=10)
+        ttk.Button(capture_row, text="Screen Shot", width=18, command=self.run_screenshot).pack(side=tk.LEFT, padx=10)
+        ttk.Button(capture_row, text="Check Network", width=18, command=key("Check Network")).pack(side=tk.LEFT, padx=10)
+        ttk.Button(capture_row, text="Check Activity", width=18, command=self.run_check_activity).pack(side=tk.LEFT, padx=10)
 
         # Row: Text input / Execute command
         text_row = ttk.Frame(outer)
         text_row.pack(fill=tk.X, pady=4)
         self.text_input_entry = ttk.Entry(text_row, width=68)
         self.text_input_entry.pack(side=tk.LEFT, padx=(6,4))
+        # no <Return> binding: this entry feeds both Execute Command and Enter Text
         ttk.Button(text_row, text="Execute Command", width=18, command=self.run_execute_command).pack(side=tk.LEFT, padx=6)
         ttk.Button(text_row, text="Enter Text", width=18, command=self.run_text_input).pack(side=tk.LEFT, padx=6)
 
@@ -516,6 +863,7 @@ class ADBTool:
         start_row.pack(fill=tk.X, pady=6)
         self.start_activity_entry = ttk.Entry(start_row, width=86)
         self.start_activity_entry.pack(side=tk.LEFT, padx=(6,4))
+        self.start_activity_entry.bind("<Return>", lambda e: self.run_start_activity())
         ttk.Button(start_row, text="Start Package/Activity", width=22, command=self.run_start_activity).pack(side=tk.LEFT, padx=6)
 
 
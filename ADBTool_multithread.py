@@ -11,7 +11,171 @@ import subprocess
 import os
 from datetime import datetime
 import threading
+from concurrent.futures import ThreadPoolExecutor
+import queue
 from queue import Queue
+import re
+import shlex
+import time
+import itertools
+import functools
+import json
+import sys
+import faulthandler
+import logging
+
+import formatters
+
+logger = logging.getLogger(__name__)
+
+# Resolved once at import; only user-typed paths still go through os.path.expanduser
+HOME = os.path.expanduser("~")
+DESKTOP = os.path.join(HOME, "Desktop")
+DESKTOP_DEFAULT = DESKTOP + os.sep
+# Folders the user last picked for each local-path entry; kept in HOME, since a packaged app's own folder is read-only
+_SETTINGS_FILE = os.path.join(HOME, ".adbtool_settings.json")
+# Log file, so windowed builds (no stderr) still record startup failures; shows up in Console.app
+_LOG_FILE = os.path.join(HOME, "Library", "Logs", "ADBTool.log")
+
+# Marker line echoed before each property in the batched getprop call: ___<property>___
+_PROP_MARKER = re.compile(r"___(\S+)___")
+# Echoed (with a per-command tag, then the exit status) after each command sent to the persistent adb shell
+_SHELL_DONE = "__DONE_{}__"
+# Streamed output lines arriving within this window are drained into the Text widget in one insert
+_STREAM_COALESCE_MS = 16
+# While a command runs, the queue is also drained this often in case a <<AdbResult>> event is lost
+_HEARTBEAT_MS = 500
+# Volume presses this close together are sent to the device as one `input keyevent` call
+_VOLUME_DEBOUNCE_MS = 150
+# Formatted results are handed to the Tk thread in pieces of at most this many characters
+_RESULT_CHUNK = 64 * 1024
+# Characters of output kept from a directly spawned command (e.g. a typed `adb logcat`); the rest is drained and dropped
+_OUTPUT_CAP = 64 * 1024
+# Seconds a device's `pm list packages` output is reused by package searches
+_PKG_CACHE_TTL = 30
+# While a push/pull runs, the size of its destination file is checked this often (seconds)
+_TRANSFER_POLL_S = 0.5
+# Characters that make a typed command need a host shell (pipes, redirects, globbing, brace expansion, comments)
+_SHELL_META = re.compile(r"[|&;<>()$`*?~\[\]{}#]")
+# First words that only a shell understands: builtins with no executable of their own, and reserved words
+_SHELL_BUILTINS = frozenset({
+    ".", ":", "alias", "bg", "break", "cd", "command", "continue", "eval", "exec", "exit", "export", "fg",
+    "getopts", "hash", "jobs", "read", "readonly", "return", "set", "shift", "source", "times", "trap",
+    "type", "ulimit", "umask", "unalias", "unset", "wait",
+    "!", "{", "case", "for", "function", "if", "select", "time", "until", "while",
+})
+
+class AdbShell:
+    """One long-lived `adb shell` process; command lines are written to its stdin one at a time.
+
+    Saves the adb client start-up and handshake a fresh `adb shell ...` process pays on every command.
+    The process is restarted on next use if it exits (e.g. the device was unplugged).
+    """
+
+    def __init__(self, adb_path):
+        self.adb_path = adb_path
+        self.lock = threading.Lock()
+        self._tags = itertools.count()
+        self.process = self._start()
+
+    def _start(self):
+        try:
+            return subprocess.Popen(
+                [self.adb_path, "shell"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=-1
+            )
+        except OSError:
+            return None
+
+    def _write(self, text):
+        if self.process is None or self.process.poll() is not None:
+            # not started, or exited: start a fresh one
+            self.process = self._start()
+        self.process.stdin.write(text)
+        self.process.stdin.flush()
+
+    def exec(self, line, on_line=None, timeout=300):
+        """Run a command line in the shell; returns (output, exit status).
+
+        Blocks until the command finishes, so only call it from a worker thread.
+        on_line, if given, is called with each output line as it is read.
+        Raises subprocess.TimeoutExpired if the command runs longer than timeout seconds;
+        the shell is then killed and a fresh one started.
+        """
+        with self.lock:
+            # tagged per command, so a marker can only end the command that echoed it
+            marker = _SHELL_DONE.format(next(self._tags))
+            try:
+                self._write(f"{line}\necho {marker}$?\n")
+            except (OSError, AttributeError):
+                self.process = None
+                process = subprocess.run([self.adb_path, "shell", line], capture_output=True, text=True, timeout=timeout)
+                output = (process.stdout or "") + (process.stderr or "")
+                if on_line and output:
+                    on_line(output)
+                return output, process.returncode
+
+            process = self.process
+            timed_out = threading.Event()
+
+            def expire():
+                # same limit as the direct Popen path; killing the shell ends the read below
+                timed_out.set()
+                process.kill()
+            watchdog = threading.Timer(timeout, expire)
+            watchdog.start()
+            output = []
+            returncode = None
+            try:
+                for ln in iter(process.stdout.readline, ""):
+                    # output without a trailing newline runs straight into the marker
+                    head, found, status = ln.partition(marker)
+                    if head:
+                        output.append(head)
+                        if on_line:
+                            on_line(head)
+                    if found:
+                        returncode = int(status.strip() or 0)
+                        break
+                else:
+                    # EOF before the marker: the shell died; it is restarted on next use
+                    self.process = None
+            finally:
+                watchdog.cancel()
+            if timed_out.is_set() and returncode is None:
+                process.wait()
+                self.process = self._start()
+                raise subprocess.TimeoutExpired(line, timeout, output="".join(output))
+            return "".join(output), returncode
+
+    def send(self, line):
+        """Write a fire-and-forget command; False if it could not be sent.
+
+        Never blocks: if another command holds the shell, nothing is sent. Nor is it when the shell
+        isn't running, since a freshly started one may fail (e.g. no device) with nobody reading its error.
+        """
+        if not self.lock.acquire(blocking=False):
+            return False
+        try:
+            if self.process is None or self.process.poll() is not None:
+                return False
+            # output is discarded so nothing is left in the pipe for the next exec
+            self._write(f"{line} >/dev/null 2>&1\n")
+            return True
+        except (OSError, AttributeError):
+            self.process = None
+            return False
+        finally:
+            self.lock.release()
+
+    def kill(self):
+        process = self.process
+        if process is not None and process.poll() is None:
+            process.kill()
 
 
 # Optional: install ttkbootstrap for a modern theme:
@@ -19,6 +183,30 @@ from queue import Queue
 # import ttkbootstrap as tb
 
 class ADBTool:
+    # Buttons bound to one fixed adb command:
+    # (key, row, text, width, args after adb, formatter name, fire-and-forget via the shell).
+    # Each becomes self.<key>_button; see _add_buttons.
+    BUTTONS = (
+        ("list_devices", "top", "List Devices", 18, ("devices",), "format_devices", False),
+        ("shutdown", "sys", "Shutdown", 18, ("reboot", "-p"), "format_shutdown", False),
+        ("recovery", "sys", "Recovery Mode", 18, ("reboot", "recovery"), "format_recovery", False),
+        ("reboot", "sys", "Reboot", 18, ("reboot",), "format_reboot", False),
+        ("back", "nav", "Back", 14, ("shell", "input", "keyevent", "4"), "format_back", True),
+        ("home", "nav", "Home", 14, ("shell", "input", "keyevent", "3"), "format_home", True),
+        ("apps", "nav", "Applications", 14, ("shell", "input", "keyevent", "187"), "format_applications", True),
+        ("vol_up", "nav", "Volume Up", 14, ("shell", "input", "keyevent", "24"), "format_volume_up", True),
+        ("power", "nav", "Lock/Unlock", 14, ("shell", "input", "keyevent", "26"), "format_power", True),
+        ("vol_down", "nav", "Volume Down", 14, ("shell", "input", "keyevent", "25"), "format_volume_down", True),
+        ("settings", "settings", "Settings", 20,
+         ("shell", "am", "start", "-n", "com.android.settings/.Settings"), "format_settings", True),
+        ("factory", "settings", "Factory Test", 20,
+         ("shell", "am", "start", "-n", "com.ubx.factorykit/.Framework.Framework"), "format_factory_test", True),
+        ("network", "capture", "Check Network", 18, ("shell", "ifconfig"), "format_network", False),
+        ("activity", "capture", "Check Activity", 18, ("shell", "dumpsys", "activity", "activities"), "format_activity", False),
+    )
+    # BUTTONS keys whose raw output is only parsed by the formatter, so it isn't streamed into the window
+    UNSTREAMED = frozenset({"activity"})
+
     def __init__(self, root):
         self.root = root
         self.root.title("ADB Tool (Patrick Xu) - macOS")
@@ -38,6 +226,18 @@ class ADBTool:
         # Track running commands to show progress
         self.command_running = False
         self.progress_counter = 0
+        self._progress_job = None
+        # Set while a <<AdbResult>> event is in flight, so a burst of streamed lines fires only one
+        self._drain_pending = False
+        # False until the running command's first output line has been shown
+        self._stream_open = False
+        # Safety-net drain, scheduled only while a command is running; idle, nothing polls
+        self._heartbeat_job = None
+        # Volume presses not yet sent, per BUTTONS key; flushed by _flush_volume
+        self._pending_vol = {"vol_up": 0, "vol_down": 0}
+        self._vol_timer = None
+        # Event time of the last paste handled by handle_paste
+        self._last_paste = None
 
         # Check if ADB is available
         if not self.check_adb():
@@ -49,6 +249,22 @@ class ADBTool:
             root.destroy()
             return
 
+        # Worker threads are reused across clicks instead of starting a new thread per command
+        self.pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="adb-")
+        self._running_process = None
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        # Warm up the adb server while the window is being built, so the first click doesn't wait for it
+        self.pool.submit(subprocess.run, [self.adb_path, "start-server"], capture_output=True, timeout=10)
+
+        # Long-lived `adb shell`: "adb shell ..." commands are written to its stdin one at a time
+        self.adb_shell = AdbShell(self.adb_path)
+        # Last `pm list packages` output, keyed by device serial; see _list_packages
+        self._pkg_cache = {"serial": None, "ts": 0.0, "output": ""}
+        self.settings = self._load_settings()
+
+        # Build the whole window hidden and show it once, so geometry is negotiated a single time
+        self.root.withdraw()
+
         # Top-level paned window: controls (top) and output (bottom)
         pw = ttk.Panedwindow(self.root, orient=tk.VERTICAL)
         pw.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
@@ -75,28 +291,82 @@ class ADBTool:
 
         # Insert a short welcome message
         self.output_text.insert(tk.END, "ADB Tool ready. Click 'List Devices' to begin.\n")
+        self.root.update_idletasks()
+        self.root.deiconify()
 
-        # Start progress update loop
-        self.root.after(1000, self._update_progress)
+        # Worker threads fire this after queueing a result, so the queue is drained only when needed
+        self.root.bind("<<AdbResult>>", lambda e: self.root.after(_STREAM_COALESCE_MS, self._check_queue))
 
     def check_adb(self):
-        """Check if ADB is available in PATH (macOS-friendly)"""
-        try:
-            which = subprocess.run(["which", self.adb_path], capture_output=True, text=True)
-            if which.returncode != 0 or not which.stdout.strip():
-                return False
-            result = subprocess.run([self.adb_path, "--version"], capture_output=True, text=True)
-            return result.returncode == 0
-        except Exception:
-            return False
+        """Check that the configured adb binary exists and is executable (no subprocess needed)"""
+        return os.path.isfile(self.adb_path) and os.access(self.adb_path, os.X_OK)
 
-    def run_single_adb_command(self, command, format_output_func, button=None):
-        """Execute ADB command in a thread with progress and display formatted result."""
+    @staticmethod
+    def _load_settings():
+        try:
+            with open(_SETTINGS_FILE, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _remember_dir(self, key, path):
+        """Save the folder of a local path used by a command as the next default for its entry."""
+        # a folder (e.g. a pull target) is kept itself, a file by the folder it is in
+        folder = os.path.join(path if os.path.isdir(path) else os.path.dirname(path), "")
+        if self.settings.get(key) == folder:
+            return
+        self.settings[key] = folder
+        try:
+            with open(_SETTINGS_FILE, "w", encoding="utf-8") as f:
+                json.dump(self.settings, f, indent=2)
+        except OSError as e:
+            logger.warning("Could not save settings to %s: %s", _SETTINGS_FILE, e)
+
+    def _last_dir(self, key):
+        """Folder remembered under key, for a Browse dialog to open in; the Desktop if none is."""
+        folder = self.settings.get(key)
+        return folder if folder and os.path.isdir(folder) else DESKTOP
+
+    def _on_close(self):
+        """Stop the workers and their adb processes, then close the window."""
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        # pool threads are not daemons; killing what they wait on lets the interpreter exit promptly
+        process = self._running_process
+        if process is not None and process.poll() is None:
+            process.kill()
+        self.adb_shell.kill()
+        self.root.destroy()
+
+    def run_shell_input(self, argv, format_output_func, button=None, line=None):
+        """Send a quick [adb, "shell", ...] command straight to the shell and show its canned result.
+
+        line is the already-quoted shell command for argv, if the caller has it.
+        Falls back to the regular threaded path when the shell is busy or not running,
+        so adb's own errors (e.g. no devices) are shown.
+        """
+        if self.adb_shell.send(line if line is not None else shlex.join(argv[2:])):
+            # leave a running command's output alone
+            if not self.command_running:
+                self.output_text.delete(1.0, tk.END)
+                self.output_text.insert(tk.END, format_output_func(""))
+        else:
+            self.run_single_adb_command(argv, format_output_func, button)
+
+    def run_single_adb_command(self, command, format_output_func, button=None, persistent=True, stream=True):
+        """Execute ADB command in a thread with progress and display formatted result.
+
+        command is an argv list (run directly, no shell), a user-typed string (run under /bin/sh)
+        or a callable run in the worker thread that returns the output.
+        [adb, "shell", ...] lists go through the persistent shell unless persistent is False.
+        stream=False keeps the raw output out of the window, for queries whose result only parses it.
+        """
         if self.command_running:
             self._show_error("Another command is running. Please wait.")
             return
         self.command_running = True
         self.progress_counter = 0
+        self._start_progress()
+        self._arm_heartbeat()
         self.output_text.delete(1.0, tk.END)
         self.output_text.insert(tk.END, "Running command... Please wait.\n")
 
@@ -104,61 +374,174 @@ class ADBTool:
         if button:
             button.config(state=tk.DISABLED)
 
+        on_line = self._post_line if stream else None
+
         def thread_target():
             nonlocal command
             try:
-                if command == "scrcpy":
-                    # Run scrcpy in background, no new terminal
-                    process = subprocess.Popen(
-                        self.scrcpy_path,
-                        shell=True,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        text=True
-                    )
-                    # Don't wait for output, let scrcpy run independently
-                    formatted_output = format_output_func("")
+                if callable(command):
+                    self._post(("start",))
+                    formatted_output = format_output_func(command())
+                elif isinstance(command, list) and persistent and command[1] == "shell":
+                    self._post(("start",))
+                    output, _status = self.adb_shell.exec(shlex.join(command[2:]), on_line=on_line)
+                    formatted_output = format_output_func(output)
                 else:
-                    command = command.replace("adb", self.adb_path)
-                    process = subprocess.Popen(
-                        command,
-                        shell=True,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        text=True
-                    )
-                    stdout, stderr = process.communicate(timeout=300)
-                    output = (stdout or "") + (stderr or "")
+                    if isinstance(command, str):
+                        # free-form input may contain pipes/redirects, so it still runs under the shell
+                        if command == "adb" or command.startswith("adb "):
+                            command = shlex.quote(self.adb_path) + command[3:]
+                    self._post(("start",))
+                    output, _status = self._run_process(command, on_line=on_line)
                     formatted_output = format_output_func(output)
             except Exception as e:
                 formatted_output = f"Error: {str(e)}"
-            finally:
-                self.result_queue.put((formatted_output, button))
-                self.command_running = False
+            return formatted_output
+
+        self.pool.submit(thread_target).add_done_callback(functools.partial(self._on_done, button=button))
+
+    def _run_process(self, command, on_line=None):
+        """Run command with stderr merged into stdout (worker thread only); returns (output, exit status).
+
+        A string command runs under /bin/sh. At most _OUTPUT_CAP characters of output are kept,
+        and the process is killed after 300 s.
+        """
+        process = subprocess.Popen(
+            command,
+            shell=isinstance(command, str),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=-1
+        )
+        self._running_process = process
+        # Same 300 s limit communicate() used to enforce, now that output is read line by line
+        watchdog = threading.Timer(300, process.kill)
+        watchdog.start()
+        try:
+            output = []
+            kept = 0
+            truncated = False
+            for ln in process.stdout:
+                # keep reading past the cap so the command never blocks on a full pipe
+                if kept >= _OUTPUT_CAP:
+                    truncated = True
+                    continue
+                output.append(ln)
+                kept += len(ln)
+                if on_line:
+                    on_line(ln)
+            process.wait()
+            if truncated:
+                output.append(f"\n[Output truncated after {_OUTPUT_CAP // 1024} KB]\n")
+        finally:
+            watchdog.cancel()
+            self._running_process = None
+        return "".join(output), process.returncode
+
+    def _post(self, item):
+        """Queue a ("start",), ("line", text), ("progress", bar, percent) or ("done", chunks, button) item for the Tk thread.
+
+        A percent of None sets bar running in indeterminate mode; a number stops it at that value.
+        """
+        self.result_queue.put(item)
+        if not self._drain_pending:
+            self._drain_pending = True
+            self.root.event_generate("<<AdbResult>>", when="tail")
+
+    def _post_line(self, line):
+        self._post(("line", line))
+
+    def _on_done(self, future, button):
+        """Done callback of a submitted command; runs in the worker and hands its result to the Tk thread."""
+        if future.cancelled():
+            # dropped by pool.shutdown when the window closes
+            return
+        try:
+            formatted_output = future.result()
+        except Exception as e:
+            formatted_output = f"Error: {str(e)}"
+        self.command_running = False
+        self._post_result(formatted_output, button)
 
-        threading.Thread(target=thread_target, daemon=True).start()
+    def _post_result(self, formatted_output, button):
+        """Split the final result in the worker so the Tk thread only inserts ready-made pieces."""
+        chunks = [formatted_output[i:i + _RESULT_CHUNK] for i in range(0, len(formatted_output), _RESULT_CHUNK)]
+        self._post(("done", chunks, button))
 
     def _check_queue(self):
         """Check queue for results and update GUI."""
-        try:
-            while not self.result_queue.empty():
-                formatted_output, button = self.result_queue.get_nowait()
+        self._drain_pending = False
+        lines = []
+        while True:
+            try:
+                item = self.result_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] == "line":
+                lines.append(item[1])
+                continue
+            self._insert_stream(lines)
+            lines = []
+            if item[0] == "start":
+                self._stream_open = False
+            elif item[0] == "progress":
+                _, bar, percent = item
+                if percent is None:
+                    bar.config(mode="indeterminate")
+                    bar.start(20)
+                else:
+                    bar.stop()
+                    bar.config(mode="determinate", value=percent)
+            else:
+                _, chunks, button = item
                 self.output_text.delete(1.0, tk.END)
-                self.output_text.insert(tk.END, formatted_output)
+                for chunk in chunks:
+                    self.output_text.insert(tk.END, chunk)
+                    # let Tk redraw between pieces of a large result
+                    self.root.update_idletasks()
                 self.command_running = False
                 if button:
                     button.config(state=tk.NORMAL)
-        except Queue.Empty:
-            pass
-        self.root.after(100, self._check_queue)
+        self._insert_stream(lines)
+        if self.command_running:
+            self._arm_heartbeat()
+
+    def _arm_heartbeat(self):
+        if self._heartbeat_job is None:
+            self._heartbeat_job = self.root.after(_HEARTBEAT_MS, self._heartbeat)
+
+    def _heartbeat(self):
+        self._heartbeat_job = None
+        self._check_queue()
+
+    def _insert_stream(self, lines):
+        """Append streamed raw output; the first chunk replaces the placeholder and stops the progress ticker."""
+        if not lines:
+            return
+        if not self._stream_open:
+            self._stream_open = True
+            if self._progress_job is not None:
+                self.root.after_cancel(self._progress_job)
+                self._progress_job = None
+            self.output_text.delete(1.0, tk.END)
+        self.output_text.insert(tk.END, "".join(lines))
+        self.output_text.see(tk.END)
+
+    def _start_progress(self):
+        """(Re)start the once-a-second progress ticker for a newly launched command."""
+        if self._progress_job is not None:
+            self.root.after_cancel(self._progress_job)
+        self._progress_job = self.root.after(1000, self._update_progress)
 
     def _update_progress(self):
-        """Update progress message every second if command is running."""
+        """Update progress message every second while a command is running."""
+        self._progress_job = None
         if self.command_running:
             self.progress_counter += 1
             self.output_text.delete(1.0, tk.END)
             self.output_text.insert(tk.END, f"Still running... ({self.progress_counter}s)\n")
-        self.root.after(1000, self._update_progress)
+            self._progress_job = self.root.after(1000, self._update_progress)
 
     def _show_error(self, msg):
         self.output_text.delete(1.0, tk.END)
@@ -172,6 +555,8 @@ class ADBTool:
             return
         self.command_running = True
         self.progress_counter = 0
+        self._start_progress()
+        self._arm_heartbeat()
         if button:
             button.config(state=tk.DISABLED)
 
@@ -186,19 +571,33 @@ class ADBTool:
         ]
 
         def thread_target():
-            results = []
             try:
-                for prop, _label in props:
-                    process = subprocess.Popen(
-                        [self.adb_path, "shell", "getprop", prop],
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        text=True
-                    )
-                    stdout, stderr = process.communicate(timeout=30)
-                    if process.returncode != 0:
-                        raise subprocess.CalledProcessError(process.returncode, prop)
-                    results.append(stdout.strip() or "N/A")
+                # cheap precheck so a missing device fails fast instead of waiting on the getprop call
+                state = subprocess.run([self.adb_path, "get-state"], capture_output=True, text=True, timeout=1)
+                if state.stdout.strip() != "device":
+                    raise subprocess.CalledProcessError(state.returncode, "get-state")
+                # one adb call for all properties, each preceded by its marker line;
+                # exec-out gives the raw stream without the shell service's PTY/CRLF handling
+                script = " ; ".join(f"echo ___{prop}___ ; getprop {prop}" for prop, _label in props)
+                process = subprocess.Popen(
+                    [self.adb_path, "exec-out", script],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True
+                )
+                stdout, stderr = process.communicate(timeout=5)
+                if process.returncode != 0:
+                    raise subprocess.CalledProcessError(process.returncode, "getprop")
+                values = {}
+                current = None
+                for ln in stdout.splitlines():
+                    ln = ln.strip()
+                    marker = _PROP_MARKER.fullmatch(ln)
+                    if marker:
+                        current = marker[1]
+                    elif current is not None and ln:
+                        values[current] = ln
+                results = [values.get(prop) or "N/A" for prop, _label in props]
                 output_lines = ["Device Information:"]
                 output_lines.append(f"Model Number: {results[0]}-{results[1]}")
                 output_lines.append(f"{props[2][1]}: {results[2]}")
@@ -206,205 +605,90 @@ class ADBTool:
                 output_lines.append(f"{props[4][1]}: {results[4]}")
                 output_lines.append(f"{props[5][1]}: {results[5]}")
                 output_lines.append(f"{props[6][1]}: {results[6]}")
-                formatted_output = "\n".join(output_lines) + "\n\nCommand run: \"adb shell getprop <property>\""
+                formatted_output = "\n".join(output_lines) + "\n\nCommand run: \"adb exec-out getprop <property>\""
             except subprocess.TimeoutExpired:
                 formatted_output = "Error: Device info query timed out."
             except subprocess.CalledProcessError:
                 formatted_output = "No devices connected!\n"
             except Exception as e:
                 formatted_output = f"Error running adb: {e}"
-            finally:
-                self.result_queue.put((formatted_output, button))
-                self.command_running = False
-
-        threading.Thread(target=thread_target, daemon=True).start()
-
-    def format_devices(self, output):
-        lines = [ln for ln in output.splitlines() if ln.strip()]
-        if not lines or all("device" not in ln for ln in lines[1:]):
-            return "No devices connected!\n\nCommand run: \"adb devices\""
-        devices = []
-        for ln in lines[1:]:
-            devices.append(ln.replace("\tdevice", " → Connected"))
-        return "\n".join(devices) + "\n\nCommand run: \"adb devices\""
-
-    def format_install(self, output):
-        if "Success" in output or "success" in output.lower():
-            return "Installation Successful!\n\nCommand run: \"adb install <APK_PATH>\""
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return f"Installation Result:\n{output}\n\nCommand run: \"adb install <APK_PATH>\""
-
-    def format_search(self, output):
-        if not output.strip():
-            return "No package found!\n\nCommand run: \"adb shell pm list packages | grep <PACKAGE_NAME>\""
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "\n".join([ln.replace("package:", "") for ln in output.splitlines() if ln.strip()]) + \
-               "\n\nCommand run: \"adb shell pm list packages | grep <PACKAGE_NAME>\""
-
-    def format_uninstall(self, output):
-        if "Success" in output or "success" in output.lower():
-            return "Uninstallation Successful!"
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return f"Uninstallation Result:\n{output}\n\nCommand run: \"adb uninstall <PACKAGE_NAME>\""
-
-    def format_sideload(self, output):
-        if "failed" in output.lower():
-            return "Make sure the device is in sideload mode and try again.\n(Select \"Apply update from ADB\" in Recovery Mode)\n\n" + output
-        return f"Sideloading Finished. (Check output below.)\n\n{output}\n\nCommand run: \"adb sideload <FIRMWARE_PATH>.zip\""
-
-    def format_shutdown(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Shutdown initiated\n\nCommand run: \"adb reboot -p\""
-
-    def format_recovery(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Recovery initiated\n\nCommand run: \"adb reboot recovery\""
-
-    def format_reboot(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Reboot initiated\n\nCommand run: \"adb reboot\""
-
-    def format_back(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Back command executed\n\nCommand run: \"adb shell input keyevent 4\""
-
-    def format_home(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Home command executed\n\nCommand run: \"adb shell input keyevent 3\""
-
-    def format_applications(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Applications command executed\n\nCommand run: \"adb shell input keyevent 187\""
-
-    def format_volume_up(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Volume Up command executed\n\nCommand run: \"adb shell input keyevent 24\""
-
-    def format_power(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Power (Lock/Unlock) command executed\n\nCommand run: \"adb shell input keyevent 26\""
-
-    def format_volume_down(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Volume Down command executed\n\nCommand run: \"adb shell input keyevent 25\""
-
-    def format_settings(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Settings command executed\n\nCommand run: \"adb shell am start -n com.android.settings/.Settings\""
-
-    def format_factory_test(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Factory Test command executed\n\nCommand run: \"adb shell am start -n com.ubx.factorykit/.Framework.Framework\""
-
-    def format_push(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        if "failed" in output.lower():
-            return "Push failed. Check the local and device paths.\n\n" + output
-        return f"File pushed successfully:\n{output}\n\nCommand run: \"adb push <LOCAL_PATH> <DEVICE_PATH>\""
-
-    def format_storage(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return f"Device Storage:\n{output}\n\nCommand run: \"adb shell ls -l <DEVICE_PATH>\""
-
-    def format_pull(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        if "failed" in output.lower():
-            return "Pull failed. Check the device and local paths.\n\n" + output
-        return f"File pulled successfully:\n{output}\n\nCommand run: \"adb pull <DEVICE_PATH> <LOCAL_PATH>\""
-
-    def format_screenshot(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        if "failed" in output.lower():
-            return "Screenshot failed. Check the device state.\n\n" + output
-        return (
-            f"Screenshot saved on device under /sdcard/Pictures/Screenshot_*.png\n"
-            "You may pull it to your Mac with adb pull.\n\n"
-            "Command run: \"adb shell screencap -p /sdcard/Pictures/<Screenshot_Timestamp>.png\""
-        )
+            return formatted_output
+
+        self.pool.submit(thread_target).add_done_callback(functools.partial(self._on_done, button=button))
+
+    # Formatters live in formatters.py (pure functions, compilable separately)
+    _no_device = staticmethod(formatters.no_device)
+    format_devices = staticmethod(formatters.format_devices)
+    format_install = staticmethod(formatters.format_install)
+    format_search = staticmethod(formatters.format_search)
+    format_uninstall = staticmethod(formatters.format_uninstall)
+    format_sideload = staticmethod(formatters.format_sideload)
+    format_shutdown = staticmethod(formatters.format_shutdown)
+    format_recovery = staticmethod(formatters.format_recovery)
+    format_reboot = staticmethod(formatters.format_reboot)
+    format_back = staticmethod(formatters.format_back)
+    format_home = staticmethod(formatters.format_home)
+    format_applications = staticmethod(formatters.format_applications)
+    format_volume_up = staticmethod(formatters.format_volume_up)
+    format_power = staticmethod(formatters.format_power)
+    format_volume_down = staticmethod(formatters.format_volume_down)
+    format_settings = staticmethod(formatters.format_settings)
+    format_factory_test = staticmethod(formatters.format_factory_test)
+    format_push = staticmethod(formatters.format_push)
+    format_storage = staticmethod(formatters.format_storage)
+    format_pull = staticmethod(formatters.format_pull)
+    format_screenshot = staticmethod(formatters.format_screenshot)
+    format_network = staticmethod(formatters.format_network)
+    format_activity = staticmethod(formatters.format_activity)
+    format_scrcpy = staticmethod(formatters.format_scrcpy)
+    format_text = staticmethod(formatters.format_text)
+    format_command = staticmethod(formatters.format_command)
+    format_start_activity = staticmethod(formatters.format_start_activity)
 
     def run_screenshot(self):
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        device_path = f"/sdcard/Pictures/Screenshot_{ts}.png"
-        local_path = os.path.expanduser(f"~/Desktop/Screenshot_{ts}.png")
-        screencap_cmd = f'adb shell screencap -p {device_path}'
-        pull_cmd = f'adb pull {device_path} "{local_path}"'
-        screencap_cmd = screencap_cmd.replace("adb", self.adb_path)
-        pull_cmd = pull_cmd.replace("adb", self.adb_path)
+        local_path = os.path.join(DESKTOP, f"Screenshot_{ts}.png")
 
         self.output_text.delete(1.0, tk.END)
         self.output_text.insert(tk.END, "Taking screenshot...\n")
 
         try:
-            screencap_process = subprocess.run(screencap_cmd, capture_output=True, text=True, shell=True)
-            screencap_output = (screencap_process.stdout or "") + (screencap_process.stderr or "")
-            if "error" in screencap_output.lower() or "no devices" in screencap_output.lower():
-                self.output_text.insert(tk.END, f"Screenshot failed: {screencap_output}\n")
+            # exec-out streams the PNG straight into the local file: no device-side copy, no pull
+            with open(local_path, "wb") as f:
+                screencap_process = subprocess.run([self.adb_path, "exec-out", "screencap", "-p"],
+                                                   stdout=f, stderr=subprocess.PIPE)
+            screencap_error = screencap_process.stderr.decode(errors="replace")
+            if screencap_process.returncode != 0 or os.path.getsize(local_path) == 0:
+                os.remove(local_path)
+                if self._no_device(screencap_error):
+                    self.output_text.insert(tk.END, "No devices connected!")
+                else:
+                    self.output_text.insert(tk.END, f"Screenshot failed: {screencap_error}\n")
                 return
-            self.output_text.insert(tk.END, "Screenshot taken on device.\n")
-
-            pull_process = subprocess.run(pull_cmd, capture_output=True, text=True, shell=True)
-            pull_output = (pull_process.stdout or "") + (pull_process.stderr or "")
-            formatted_pull = self.format_pull(pull_output)
-            self.output_text.insert(tk.END, formatted_pull + f"\nSaved to: {local_path}")
+            self.output_text.insert(tk.END, f"Screenshot saved to: {local_path}\n\n"
+                                            "Command run: \"adb exec-out screencap -p > <LOCAL_PATH>.png\"")
         except Exception as e:
             self.output_text.insert(tk.END, f"Error: {str(e)}")
 
-    def format_network(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        if not output.strip():
-            return "Network check returned no output. Device might be offline or command unsupported."
-        return f"Network configuration:\n{output}\n\nCommand run: \"adb shell ifconfig\""
-
-    def format_activity(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        if "mCurrentFocus" not in output and "mFocusedApp" not in output:
-            return "No current activity found. Output:\n" + output
-        for ln in output.splitlines():
-            if "mCurrentFocus" in ln or "mFocusedApp" in ln:
-                return f"Current focus:\n{ln.strip()}\n\nCommand run: \"adb shell dumpsys window | grep mCurrentFocus\""
-        return "Current activity (raw output):\n" + output
-
-    def format_scrcpy(self, output):
-        if "ERROR" in output.lower():
-            return "No devices connected!"
-        return "CASTING started in the BACKGROUND"
-
-    def format_text(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return "Text entered.\n\nCommand run: \"adb shell input text <TEXT>\""
-
-    def format_command(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        return output
+    def run_scrcpy(self):
+        """Start scrcpy detached from the app; the button stays disabled until its window is closed."""
+        try:
+            # scrcpy runs until the user closes it, so nothing is piped back and no worker waits on it
+            process = subprocess.Popen([self.scrcpy_path], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.DEVNULL, close_fds=True, start_new_session=True)
+        except OSError as e:
+            self._show_error(f"Could not start scrcpy: {e}")
+            return
+        self.output_text.delete(1.0, tk.END)
+        self.output_text.insert(tk.END, self.format_scrcpy(""))
+        self.scrcpy_button.config(text="Casting…", state=tk.DISABLED)
 
-    def format_start_activity(self, output):
-        if "no devices" in output.lower():
-            return "No devices connected!"
-        if "Error" in output or "not found" in output.lower():
-            return "Failed to start activity. Check the package/activity name.\n\n" + output
-        return f"Activity started (or adb returned output):\n{output}\n\nCommand run: \"adb shell am start -n <PACKAGE_NAME>/<ACTIVITY_NAME>\""
+        def check_alive():
+            if process.poll() is None:
+                self.root.after(1000, check_alive)
+            else:
+                self.scrcpy_button.config(text="Cast Screen", state=tk.NORMAL)
+        self.root.after(1000, check_alive)
 
     def run_install_apk(self):
         apk_path = self.install_apk_entry.get().strip()
@@ -415,13 +699,14 @@ class ADBTool:
         if not os.path.isfile(apk_path) or not apk_path.lower().endswith(".apk"):
             self._show_error("Please enter a valid APK path (file must exist and end with .apk)")
             return
-        cmd = f'adb install "{apk_path}"'
-        self.run_single_adb_command(cmd, self.format_install, self.install_button)
+        self._invalidate_packages()
+        self._remember_dir("install_dir", apk_path)
+        self.run_single_adb_command([self.adb_path, "install", apk_path], self.format_install, self.install_button)
 
     def browse_install_apk(self):
         """Open file dialog to select an APK file for installation."""
         file_path = filedialog.askopenfilename(
-            initialdir=os.path.expanduser("~/Desktop"),
+            initialdir=self._last_dir("install_dir"),
             title="Select APK File to Install",
             filetypes=(("APK files", "*.apk"), ("All files", "*.*"))
         )
@@ -434,29 +719,48 @@ class ADBTool:
         if not apk_name:
             self._show_error("Please enter a valid APK/package name fragment")
             return
-        cmd = f'adb shell pm list packages | grep -i "{apk_name}"'
-        self.run_single_adb_command(cmd, self.format_search, self.search_button)
+        # case-insensitive grep done in Python on the (cached) package list
+        self.run_single_adb_command(self._list_packages,
+                                    lambda out: self.format_search(formatters.filter_packages(out, apk_name)),
+                                    self.search_button)
+
+    def _list_packages(self):
+        """Return `pm list packages` output, reused for _PKG_CACHE_TTL seconds per device (worker thread only)."""
+        state = subprocess.run([self.adb_path, "get-serialno"], capture_output=True, text=True, timeout=2)
+        serial = state.stdout.strip() if state.returncode == 0 else None
+        cache = self._pkg_cache
+        if serial and cache["serial"] == serial and time.monotonic() - cache["ts"] < _PKG_CACHE_TTL:
+            return cache["output"]
+        # the raw list is only filtered, never shown, so it isn't streamed into the window
+        output, status = self.adb_shell.exec("pm list packages")
+        if serial and status == 0:
+            self._pkg_cache = {"serial": serial, "ts": time.monotonic(), "output": output}
+        return output
+
+    def _invalidate_packages(self):
+        self._pkg_cache = {"serial": None, "ts": 0.0, "output": ""}
 
     def run_uninstall_apk(self):
         apk_name = self.uninstall_apk_entry.get().strip()
         if not apk_name or "com." not in apk_name:
             self._show_error("Please enter a valid package name (e.g. com.example.app)")
             return
-        cmd = f'adb uninstall "{apk_name}"'
-        self.run_single_adb_command(cmd, self.format_uninstall, self.uninstall_button)
+        # commands run one at a time, so no search can read the stale list before this finishes
+        self._invalidate_packages()
+        self.run_single_adb_command([self.adb_path, "uninstall", apk_name], self.format_uninstall, self.uninstall_button)
 
     def run_sideload_firmware(self):
         firmware_path = os.path.expanduser(self.sideload_apk_entry.get().strip())
         if not firmware_path or not os.path.isfile(firmware_path) or not firmware_path.lower().endswith(".zip"):
             self._show_error("Please enter a valid firmware path (.zip)")
             return
-        cmd = f'adb sideload "{firmware_path}"'
-        self.run_single_adb_command(cmd, self.format_sideload, self.sideload_button)
+        self._remember_dir("sideload_dir", firmware_path)
+        self.run_single_adb_command([self.adb_path, "sideload", firmware_path], self.format_sideload, self.sideload_button)
 
     def browse_sideload_firmware(self):
         """Open file dialog to select a firmware file for sideloading."""
         file_path = filedialog.askopenfilename(
-            initialdir=os.path.expanduser("~/Desktop"),
+            initialdir=self._last_dir("sideload_dir"),
             title="Select Firmware File to Sideload",
             filetypes=(("ZIP files", "*.zip"), ("All files", "*.*"))
         )
@@ -465,15 +769,14 @@ class ADBTool:
             self.sideload_apk_entry.insert(0, file_path)
 
     def run_check_storage(self):
-        path = self.device_storage_entry.get().strip()
+        path = self._storage_path.strip()
         if not path or not path.startswith("/sdcard/"):
             self._show_error("Please enter a valid device storage path (starting with /sdcard/)")
             return
-        cmd = f'adb shell ls -l "{path}"'
-        self.run_single_adb_command(cmd, self.format_storage, self.storage_button)
+        self.run_single_adb_command([self.adb_path, "shell", "ls", "-l", path], self.format_storage, self.storage_button)
 
     def run_adb_push(self):
-        local_path = os.path.expanduser(self.push_local_entry.get().strip())
+        local_path = os.path.expanduser(self._push_local.strip())
         device_path = self.push_device_entry.get().strip()
 
         if not local_path or not os.path.exists(local_path):
@@ -483,12 +786,18 @@ class ADBTool:
             self._show_error("Please enter a valid device path (starting with /sdcard/)")
             return
 
-        cmd = f'adb push "{local_path}" "{device_path}"'
-        self.run_single_adb_command(cmd, self.format_push, self.push_button)
+        self._remember_dir("push_dir", local_path)
+        argv = [self.adb_path, "push", local_path, device_path]
+        # a folder push has no single destination file to watch, so its bar is only set busy
+        total = os.path.getsize(local_path) if os.path.isfile(local_path) else 0
+        target = device_path + os.path.basename(local_path) if device_path.endswith("/") else device_path
+        self.run_single_adb_command(
+            lambda: self._transfer(argv, self.push_progress, total, lambda: self._device_file_size(target, timeout=5)),
+            self.format_push, self.push_button)
 
     def run_adb_pull(self):
         device_path = self.pull_device_entry.get().strip()
-        local_path = os.path.expanduser(self.pull_local_entry.get().strip())
+        local_path = os.path.expanduser(self._pull_local.strip())
 
         if not device_path or not device_path.startswith("/sdcard/"):
             self._show_error("Please enter a valid device path (starting with /sdcard/)")
@@ -497,52 +806,113 @@ class ADBTool:
             self._show_error("Please select a valid local save path")
             return
 
-        cmd = f'adb pull "{device_path}" "{local_path}"'
-        self.run_single_adb_command(cmd, self.format_pull, self.pull_button)
+        self._remember_dir("pull_dir", local_path)
+        argv = [self.adb_path, "pull", device_path, local_path]
+        target = local_path
+        if os.path.isdir(local_path):
+            target = os.path.join(local_path, os.path.basename(device_path.rstrip("/")))
+        self.run_single_adb_command(
+            lambda: self._transfer(argv, self.pull_progress, self._device_file_size(device_path),
+                                   lambda: os.path.getsize(target)),
+            self.format_pull, self.pull_button)
+
+    def _transfer(self, argv, bar, total, copied):
+        """Run adb push/pull and post its progress for bar (worker thread only); returns adb's output.
+
+        total is the number of bytes being copied and copied() how many have reached the destination,
+        polled every _TRANSFER_POLL_S while adb runs (adb prints its own "[ nn%]" only to a terminal).
+        With no total the bar is just set busy. It ends at 100 on success and is reset to 0 otherwise.
+        """
+        self._post(("progress", bar, 0 if total else None))
+        finished = threading.Event()
+
+        def poll():
+            last = 0
+            while not finished.wait(_TRANSFER_POLL_S):
+                try:
+                    percent = min(99, copied() * 100 // total)
+                except (OSError, subprocess.SubprocessError):
+                    # destination not created yet, or the size query failed; try again next tick
+                    continue
+                if percent != last:
+                    last = percent
+                    self._post(("progress", bar, percent))
+        poller = threading.Thread(target=poll, daemon=True) if total else None
+        if poller:
+            poller.start()
+        status = None
+        try:
+            output, status = self._run_process(argv)
+        finally:
+            finished.set()
+            if poller:
+                # so a late reading can't overwrite the final value
+                poller.join()
+            self._post(("progress", bar, 100 if status == 0 else 0))
+        return output
+
+    def _device_file_size(self, device_path, timeout=300):
+        """Size in bytes of a regular file on the device; 0 if it doesn't exist or isn't a file."""
+        quoted = shlex.quote(device_path)
+        output, status = self.adb_shell.exec(f"[ -f {quoted} ] && stat -c %s {quoted}", timeout=timeout)
+        return int(output) if status == 0 and output.strip().isdigit() else 0
 
     def run_text_input(self):
-        text = self.text_input_entry.get().strip()
+        text = self._text_input.strip()
         if not text:
             self._show_error("Please enter some text")
             return
-        safe_text = text.replace('"', '\\"')
-        cmd = f'adb shell input text "{safe_text}"'
-        self.run_single_adb_command(cmd, self.format_text, self.text_button)
+        self.run_single_adb_command([self.adb_path, "shell", "input", "text", text], self.format_text, self.text_button)
 
     def run_execute_command(self):
-        command = self.text_input_entry.get().strip()
+        command = self._text_input.strip()
         if not command:
             self._show_error("Please enter a valid command")
             return
-        self.run_single_adb_command(command, self.format_command, self.command_button)
+        if not _SHELL_META.search(command):
+            # plain commands are split once here and run without an extra /bin/sh
+            try:
+                argv = shlex.split(command)
+            except ValueError as e:
+                self._show_error(f"Could not parse command: {e}")
+                return
+            # ...unless they start with a VAR=value assignment or a builtin, which need the shell after all
+            if "=" not in argv[0] and argv[0] not in _SHELL_BUILTINS:
+                if argv[0] == "adb":
+                    argv[0] = self.adb_path
+                command = argv
+        # free-form commands may never finish (e.g. logcat), so keep them off the shared shell
+        self.run_single_adb_command(command, self.format_command, self.command_button, persistent=False)
 
     def run_start_activity(self):
-        activity = self.start_activity_entry.get().strip()
+        activity = self._start_activity.strip()
         if not activity:
             self._show_error("Please enter a valid Package/Activity (e.g. com.example/.MainActivity)")
             return
-        cmd = f'adb shell am start -n "{activity}"'
-        self.run_single_adb_command(cmd, self.format_start_activity, self.activity_button)
+        self.run_single_adb_command([self.adb_path, "shell", "am", "start", "-n", activity],
+                                    self.format_start_activity, self.activity_button)
 
     def handle_paste(self, event):
         """Handle paste events to prevent duplicate content."""
+        # Command-V fires both <Command-v> and <<Paste>> with the same event time; handle it once
+        if event.time == self._last_paste:
+            return "break"
+        self._last_paste = event.time
         entry = event.widget  # Get the Entry widget that triggered the event
         try:
-            # Get clipboard content
             clipboard = self.root.clipboard_get()
-            print(f"Clipboard content: '{clipboard}'")  # Debug: print clipboard content
-            # Clear current content and insert clipboard
-            entry.delete(0, tk.END)
-            entry.insert(0, clipboard.strip())  # Strip to remove potential newlines
-            return "break"  # Prevent default paste behavior
         except tk.TclError:
-            print("Clipboard empty or inaccessible")
+            # Clipboard empty or inaccessible
             return "break"
+        # Clear current content and insert clipboard
+        entry.delete(0, tk.END)
+        entry.insert(0, clipboard.strip())  # Strip to remove potential newlines
+        return "break"  # Prevent default paste behavior
 
     def browse_local_push(self):
         """Open file dialog to select a local file for push."""
         file_path = filedialog.askopenfilename(
-            initialdir=os.path.expanduser("~/Desktop"),
+            initialdir=self._last_dir("push_dir"),
             title="Select File to Push",
             filetypes=(("All files", "*.*"),)
         )
@@ -553,7 +923,7 @@ class ADBTool:
     def browse_local_pull(self):
         """Open file dialog to select a local save path for pull."""
         file_path = filedialog.asksaveasfilename(
-            initialdir=os.path.expanduser("~/Desktop"),
+            initialdir=self._last_dir("pull_dir"),
             title="Select Save Location for Pull",
             filetypes=(("All files", "*.*"),),
             defaultextension=".bin"
@@ -562,22 +932,77 @@ class ADBTool:
             self.pull_local_entry.delete(0, tk.END)  # Clear before inserting
             self.pull_local_entry.insert(0, file_path)
 
+    def _add_buttons(self, parent, row, padx):
+        """Create the BUTTONS entries for one row; their argv lists are built once here, not per click."""
+        for key, button_row, text, width, args, _fmt, quick in self.BUTTONS:
+            if button_row != row:
+                continue
+            self._button_argv[key] = [self.adb_path, *args]
+            if quick:
+                # what the persistent shell is sent: just the part after "adb shell"
+                self._button_line[key] = shlex.join(args[1:])
+            button = ttk.Button(parent, text=text, width=width)
+            button.configure(command=functools.partial(self._dispatch, key, button))
+            button.pack(side=tk.LEFT, padx=padx)
+            setattr(self, f"{key}_button", button)
+
+    def _dispatch(self, key, button):
+        """Run the fixed command behind a BUTTONS entry."""
+        if key in self._pending_vol:
+            self._press_volume(key)
+            return
+        _key, _row, _text, _width, _args, formatter_name, quick = self._button_specs[key]
+        if quick:
+            self.run_shell_input(self._button_argv[key], getattr(self, formatter_name), button,
+                                 line=self._button_line[key])
+        else:
+            self.run_single_adb_command(self._button_argv[key], getattr(self, formatter_name), button,
+                                        stream=key not in self.UNSTREAMED)
+
+    def _press_volume(self, key):
+        """Count a volume press; a burst of them is flushed once the presses stop for _VOLUME_DEBOUNCE_MS."""
+        self._pending_vol[key] += 1
+        if self._vol_timer is not None:
+            self.root.after_cancel(self._vol_timer)
+        self._vol_timer = self.root.after(_VOLUME_DEBOUNCE_MS, self._flush_volume)
+
+    def _flush_volume(self):
+        self._vol_timer = None
+        for key, count in self._pending_vol.items():
+            if not count:
+                continue
+            self._pending_vol[key] = 0
+            # `input keyevent` takes several key codes, so n presses cost one call on the device
+            argv = self._button_argv[key] + self._button_argv[key][-1:] * (count - 1)
+            formatter_name = self._button_specs[key][5]
+            self.run_shell_input(argv, getattr(self, formatter_name), getattr(self, f"{key}_button"))
+
+    def _mirrored_entry(self, parent, attr, width, value=""):
+        """Entry whose text is kept in self.<attr> on every edit, so click handlers read a plain str."""
+        var = tk.StringVar(value=value)
+        setattr(self, attr, value)
+        var.trace_add("write", lambda *_: setattr(self, attr, var.get()))
+        # keep the variable referenced for as long as the entry, or Tk drops the binding
+        setattr(self, f"{attr}_var", var)
+        return ttk.Entry(parent, width=width, textvariable=var)
+
     def create_controls(self):
         outer = self.controls_frame
+        self._button_specs = {spec[0]: spec for spec in self.BUTTONS}
+        self._button_argv = {}
+        self._button_line = {}
 
         top_row = ttk.Frame(outer)
         top_row.pack(fill=tk.X, pady=(4,8))
         self.device_info_button = ttk.Button(top_row, text="Get Device Info", width=18, command=self.run_adb_command_device_info)
         self.device_info_button.pack(side=tk.LEFT, padx=6)
-        self.list_devices_button = ttk.Button(top_row, text="List Devices", width=18, command=lambda: self.run_single_adb_command("adb devices", self.format_devices, self.list_devices_button))
-        self.list_devices_button.pack(side=tk.LEFT, padx=6)
+        self._add_buttons(top_row, "top", padx=6)
 
         install_row = ttk.Frame(outer)
         install_row.pack(fill=tk.X, pady=4)
-        desktop_default = os.path.join(os.path.expanduser("~"), "Desktop")
         self.install_apk_entry = ttk.Entry(install_row, width=68)
         self.install_apk_entry.pack(side=tk.LEFT, padx=(6, 4))
-        self.install_apk_entry.insert(0, desktop_default + os.sep)
+        self.install_apk_entry.insert(0, self.settings.get("install_dir", DESKTOP_DEFAULT))
         self.install_apk_entry.bind("<Command-v>", self.handle_paste)
         self.install_apk_entry.bind("<<Paste>>", self.handle_paste)
         ttk.Button(install_row, text="Browse", width=10, command=self.browse_install_apk).pack(side=tk.LEFT, padx=4)
@@ -600,7 +1025,7 @@ class ADBTool:
         sideload_row.pack(fill=tk.X, pady=4)
         self.sideload_apk_entry = ttk.Entry(sideload_row, width=68)
         self.sideload_apk_entry.pack(side=tk.LEFT, padx=(6, 4))
-        self.sideload_apk_entry.insert(0, desktop_default + os.sep)
+        self.sideload_apk_entry.insert(0, self.settings.get("sideload_dir", DESKTOP_DEFAULT))
         self.sideload_apk_entry.bind("<Command-v>", self.handle_paste)
         self.sideload_apk_entry.bind("<<Paste>>", self.handle_paste)
         ttk.Button(sideload_row, text="Browse", width=10, command=self.browse_sideload_firmware).pack(side=tk.LEFT,
@@ -611,48 +1036,27 @@ class ADBTool:
 
         sys_row = ttk.Frame(outer)
         sys_row.pack(fill=tk.X, pady=4)
-        self.shutdown_button = ttk.Button(sys_row, text="Shutdown", width=18, command=lambda: self.run_single_adb_command("adb reboot -p", self.format_shutdown, self.shutdown_button))
-        self.shutdown_button.pack(side=tk.LEFT, padx=10)
-        self.recovery_button = ttk.Button(sys_row, text="Recovery Mode", width=18, command=lambda: self.run_single_adb_command("adb reboot recovery", self.format_recovery, self.recovery_button))
-        self.recovery_button.pack(side=tk.LEFT, padx=10)
-        self.reboot_button = ttk.Button(sys_row, text="Reboot", width=18, command=lambda: self.run_single_adb_command("adb reboot", self.format_reboot, self.reboot_button))
-        self.reboot_button.pack(side=tk.LEFT, padx=10)
+        self._add_buttons(sys_row, "sys", padx=10)
 
         nav_row = ttk.Frame(outer)
         nav_row.pack(fill=tk.X, pady=4)
-        self.back_button = ttk.Button(nav_row, text="Back", width=14, command=lambda: self.run_single_adb_command("adb shell input keyevent 4", self.format_back, self.back_button))
-        self.back_button.pack(side=tk.LEFT, padx=6)
-        self.home_button = ttk.Button(nav_row, text="Home", width=14, command=lambda: self.run_single_adb_command("adb shell input keyevent 3", self.format_home, self.home_button))
-        self.home_button.pack(side=tk.LEFT, padx=6)
-        self.apps_button = ttk.Button(nav_row, text="Applications", width=14, command=lambda: self.run_single_adb_command("adb shell input keyevent 187", self.format_applications, self.apps_button))
-        self.apps_button.pack(side=tk.LEFT, padx=6)
-        self.vol_up_button = ttk.Button(nav_row, text="Volume Up", width=14, command=lambda: self.run_single_adb_command("adb shell input keyevent 24", self.format_volume_up, self.vol_up_button))
-        self.vol_up_button.pack(side=tk.LEFT, padx=6)
-        self.power_button = ttk.Button(nav_row, text="Lock/Unlock", width=14, command=lambda: self.run_single_adb_command("adb shell input keyevent 26", self.format_power, self.power_button))
-        self.power_button.pack(side=tk.LEFT, padx=6)
-        self.vol_down_button = ttk.Button(nav_row, text="Volume Down", width=14, command=lambda: self.run_single_adb_command("adb shell input keyevent 25", self.format_volume_down, self.vol_down_button))
-        self.vol_down_button.pack(side=tk.LEFT, padx=6)
+        self._add_buttons(nav_row, "nav", padx=6)
 
         srow = ttk.Frame(outer)
         srow.pack(fill=tk.X, pady=4)
-        self.settings_button = ttk.Button(srow, text="Settings", width=20, command=lambda: self.run_single_adb_command("adb shell am start -n com.android.settings/.Settings", self.format_settings, self.settings_button))
-        self.settings_button.pack(side=tk.LEFT, padx=10)
-        self.factory_button = ttk.Button(srow, text="Factory Test", width=20, command=lambda: self.run_single_adb_command("adb shell am start -n com.ubx.factorykit/.Framework.Framework", self.format_factory_test, self.factory_button))
-        self.factory_button.pack(side=tk.LEFT, padx=10)
+        self._add_buttons(srow, "settings", padx=10)
 
         storage_row = ttk.Frame(outer)
         storage_row.pack(fill=tk.X, pady=4)
-        self.device_storage_entry = ttk.Entry(storage_row, width=86)
+        self.device_storage_entry = self._mirrored_entry(storage_row, "_storage_path", 86, "/sdcard/")
         self.device_storage_entry.pack(side=tk.LEFT, padx=(6,4))
-        self.device_storage_entry.insert(0, "/sdcard/")
         self.storage_button = ttk.Button(storage_row, text="Check Device Storage", width=18, command=self.run_check_storage)
         self.storage_button.pack(side=tk.LEFT, padx=6)
 
         push_row = ttk.Frame(outer)
         push_row.pack(fill=tk.X, pady=4)
-        self.push_local_entry = ttk.Entry(push_row, width=38)
+        self.push_local_entry = self._mirrored_entry(push_row, "_push_local", 38, self.settings.get("push_dir", DESKTOP_DEFAULT))
         self.push_local_entry.pack(side=tk.LEFT, padx=(6, 4))
-        self.push_local_entry.insert(0, os.path.join(os.path.expanduser("~"), "Desktop") + os.sep)
         # Bind paste events
         self.push_local_entry.bind("<Command-v>", self.handle_paste)
         self.push_local_entry.bind("<<Paste>>", self.handle_paste)
@@ -663,13 +1067,14 @@ class ADBTool:
         self.push_device_entry.insert(0, "/sdcard/")
         self.push_button = ttk.Button(push_row, text="Push File to device", width=18, command=self.run_adb_push)
         self.push_button.pack(side=tk.LEFT, padx=8)
+        self.push_progress = ttk.Progressbar(push_row, length=100, maximum=100, mode="determinate")
+        self.push_progress.pack(side=tk.LEFT, padx=4)
 
         # Row: Pull
         pull_row = ttk.Frame(outer)
         pull_row.pack(fill=tk.X, pady=4)
-        self.pull_local_entry = ttk.Entry(pull_row, width=38)
+        self.pull_local_entry = self._mirrored_entry(pull_row, "_pull_local", 38, self.settings.get("pull_dir", DESKTOP_DEFAULT))
         self.pull_local_entry.pack(side=tk.LEFT, padx=(6, 4))
-        self.pull_local_entry.insert(0, os.path.join(os.path.expanduser("~"), "Desktop") + os.sep)
         # Bind paste events
         self.pull_local_entry.bind("<Command-v>", self.handle_paste)
         self.pull_local_entry.bind("<<Paste>>", self.handle_paste)
@@ -680,23 +1085,20 @@ class ADBTool:
         self.pull_device_entry.insert(0, "/sdcard/")
         self.pull_button = ttk.Button(pull_row, text="Pull File from device", width=18, command=self.run_adb_pull)
         self.pull_button.pack(side=tk.LEFT, padx=8)
+        self.pull_progress = ttk.Progressbar(pull_row, length=100, maximum=100, mode="determinate")
+        self.pull_progress.pack(side=tk.LEFT, padx=4)
 
         capture_row = ttk.Frame(outer)
         capture_row.pack(fill=tk.X, pady=4)
-        ts = datetime.now().strftime("%Y%m%d%H%M%S")
-        screenshot_cmd = f'adb shell screencap -p /sdcard/Pictures/Screenshot_{ts}.png'
         self.screenshot_button = ttk.Button(capture_row, text="Screen Shot", width=18, command=self.run_screenshot)
         self.screenshot_button.pack(side=tk.LEFT, padx=10)
-        self.network_button = ttk.Button(capture_row, text="Check Network", width=18, command=lambda: self.run_single_adb_command("adb shell ifconfig", self.format_network, self.network_button))
-        self.network_button.pack(side=tk.LEFT, padx=10)
-        self.activity_button = ttk.Button(capture_row, text="Check Activity", width=18, command=lambda: self.run_single_adb_command("adb shell dumpsys window | grep mCurrentFocus", self.format_activity, self.activity_button))
-        self.activity_button.pack(side=tk.LEFT, padx=10)
-        self.scrcpy_button = ttk.Button(capture_row, text="Cast Screen", width=18, command=lambda: self.run_single_adb_command("scrcpy", self.format_scrcpy, self.scrcpy_button))
+        self._add_buttons(capture_row, "capture", padx=10)
+        self.scrcpy_button = ttk.Button(capture_row, text="Cast Screen", width=18, command=self.run_scrcpy)
         self.scrcpy_button.pack(side=tk.LEFT, padx=10)
 
         text_row = ttk.Frame(outer)
         text_row.pack(fill=tk.X, pady=4)
-        self.text_input_entry = ttk.Entry(text_row, width=68)
+        self.text_input_entry = self._mirrored_entry(text_row, "_text_input", 68)
         self.text_input_entry.pack(side=tk.LEFT, padx=(6,4))
         self.command_button = ttk.Button(text_row, text="Execute Command", width=18, command=self.run_execute_command)
         self.command_button.pack(side=tk.LEFT, padx=6)
@@ -705,24 +1107,35 @@ class ADBTool:
 
         start_row = ttk.Frame(outer)
         start_row.pack(fill=tk.X, pady=6)
-        self.start_activity_entry = ttk.Entry(start_row, width=86)
+        self.start_activity_entry = self._mirrored_entry(start_row, "_start_activity", 86)
         self.start_activity_entry.pack(side=tk.LEFT, padx=(6,4))
         self.activity_button = ttk.Button(start_row, text="Start Package/Activity", width=22, command=self.run_start_activity)
         self.activity_button.pack(side=tk.LEFT, padx=6)
 
-        # Start queue checking
-        self.root.after(100, self._check_queue)
-
 def main():
+    handlers = []
+    try:
+        os.makedirs(os.path.dirname(_LOG_FILE), exist_ok=True)
+        handlers.append(logging.FileHandler(_LOG_FILE, encoding="utf-8"))
+    except OSError:
+        pass
+    # windowed (pyinstaller --noconsole) builds have no stderr to dump tracebacks to
+    if sys.stderr is not None:
+        faulthandler.enable()
+        handlers.append(logging.StreamHandler())
+    elif handlers:
+        faulthandler.enable(file=handlers[0].stream)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s",
+                        handlers=handlers or None)
     try:
-        print("Starting Tkinter application...")
+        logger.debug("Starting Tkinter application...")
         root = tk.Tk()
-        print("Root window created")
+        logger.debug("Root window created")
         app = ADBTool(root)
-        print("ADBTool instance created")
+        logger.debug("ADBTool instance created")
         root.mainloop()
-    except Exception as e:
-        print(e)
+    except Exception:
+        logger.exception("startup failed")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""
+@description: Output formatters for ADBTool_multithread: turn raw adb output into the text shown in the window.
+
+Plain, fully annotated functions over str with no Tk or subprocess dependency, so this module can be
+compiled on its own with `mypyc formatters.py` (see README). The built formatters.*.so is then imported in
+place of this file; if it wasn't built, this file is used as is.
+"""
+
+import re
+from typing import Callable
+
+# Case-insensitive result markers, searched in place instead of lowercasing the whole output
+_NO_DEV_RE = re.compile(r"no devices", re.I)
+_SUCCESS_RE = re.compile(r"success", re.I)
+_FAILED_RE = re.compile(r"failed", re.I)
+_ERROR_RE = re.compile(r"error", re.I)
+_NOT_FOUND_RE = re.compile(r"not found", re.I)
+# Component of the resumed activity: "mResumedActivity: ActivityRecord{1a2b3c u0 com.example/.Main t12}"
+_RE_ACTIVITY = re.compile(r"ResumedActivity[:=] ?ActivityRecord\{\S+ \S+ ([^\s}]+)")
+# Carriage returns, NULs and escape characters that adb output may carry but the Text widget shouldn't show
+_STRIP = str.maketrans("", "", "\r\x00\x1b")
+
+# "Command run" footers shared by the formatters that interpolate adb output
+_SUF_DEVICES = "\n\nCommand run: \"adb devices\""
+_SUF_INSTALL = "\n\nCommand run: \"adb install <APK_PATH>\""
+_SUF_SEARCH = "\n\nCommand run: \"adb shell pm list packages | grep <PACKAGE_NAME>\""
+_SUF_UNINSTALL = "\n\nCommand run: \"adb uninstall <PACKAGE_NAME>\""
+_SUF_SIDELOAD = "\n\nCommand run: \"adb sideload <FIRMWARE_PATH>.zip\""
+_SUF_PUSH = "\n\nCommand run: \"adb push <LOCAL_PATH> <DEVICE_PATH>\""
+_SUF_STORAGE = "\n\nCommand run: \"adb shell ls -l <DEVICE_PATH>\""
+_SUF_PULL = "\n\nCommand run: \"adb pull <DEVICE_PATH> <LOCAL_PATH>\""
+_SUF_NETWORK = "\n\nCommand run: \"adb shell ifconfig\""
+_SUF_ACTIVITY = "\n\nCommand run: \"adb shell dumpsys activity activities | grep mResumedActivity\""
+_SUF_START_ACTIVITY = "\n\nCommand run: \"adb shell am start -n <PACKAGE_NAME>/<ACTIVITY_NAME>\""
+
+
+def no_device(output: str) -> bool:
+    return _NO_DEV_RE.search(output) is not None
+
+
+def clean(output: str) -> str:
+    return output.translate(_STRIP)
+
+
+def _status_formatter(message: str, command: str) -> Callable[[str], str]:
+    """Build a formatter that returns a fixed status message (or the no-devices error)."""
+    result = f"{message}\n\nCommand run: \"{command}\""
+
+    def format_output(output: str) -> str:
+        return "No devices connected!" if no_device(output) else result
+    return format_output
+
+
+def format_devices(output: str) -> str:
+    # each device line is "<serial>\t<state>"; the "List of devices attached" header has no tab
+    devices: list[str] = []
+    for ln in output.splitlines()[1:]:
+        serial, tab, state = ln.partition("\t")
+        if tab:
+            devices.append(f"{serial} → Connected" if state == "device" else f"{serial} → {state}")
+    if not devices:
+        return "No devices connected!" + _SUF_DEVICES
+    return "\n".join(devices) + _SUF_DEVICES
+
+
+def format_install(output: str) -> str:
+    if _SUCCESS_RE.search(output):
+        return "Installation Successful!" + _SUF_INSTALL
+    if no_device(output):
+        return "No devices connected!"
+    return f"Installation Result:\n{clean(output)}{_SUF_INSTALL}"
+
+
+def format_search(output: str) -> str:
+    lines: list[str] = [ln[8:] if ln.startswith("package:") else ln for ln in output.splitlines() if ln.strip()]
+    if not lines:
+        return "No package found!" + _SUF_SEARCH
+    if no_device(output):
+        return "No devices connected!"
+    return "\n".join(lines) + _SUF_SEARCH
+
+
+def filter_packages(output: str, name: str) -> str:
+    """Case-insensitive `pm list packages | grep -i name` done in Python; adb's "no devices" error line is kept."""
+    needle: str = name.casefold()
+    return "\n".join(ln for ln in output.splitlines()
+                     if (ln.startswith("package:") and needle in ln[8:].casefold()) or no_device(ln))
+
+
+def format_uninstall(output: str) -> str:
+    if _SUCCESS_RE.search(output):
+        return "Uninstallation Successful!"
+    if no_device(output):
+        return "No devices connected!"
+    return f"Uninstallation Result:\n{clean(output)}{_SUF_UNINSTALL}"
+
+
+def format_sideload(output: str) -> str:
+    if _FAILED_RE.search(output):
+        return "Make sure the device is in sideload mode and try again.\n(Select \"Apply update from ADB\" in Recovery Mode)\n\n" + clean(output)
+    return f"Sideloading Finished. (Check output below.)\n\n{clean(output)}{_SUF_SIDELOAD}"
+
+
+format_shutdown = _status_formatter("Shutdown initiated", "adb reboot -p")
+format_recovery = _status_formatter("Recovery initiated", "adb reboot recovery")
+format_reboot = _status_formatter("Reboot initiated", "adb reboot")
+format_back = _status_formatter("Back command executed", "adb shell input keyevent 4")
+format_home = _status_formatter("Home command executed", "adb shell input keyevent 3")
+format_applications = _status_formatter("Applications command executed", "adb shell input keyevent 187")
+format_volume_up = _status_formatter("Volume Up command executed", "adb shell input keyevent 24")
+format_power = _status_formatter("Power (Lock/Unlock) command executed", "adb shell input keyevent 26")
+format_volume_down = _status_formatter("Volume Down command executed", "adb shell input keyevent 25")
+format_settings = _status_formatter("Settings command executed", "adb shell am start -n com.android.settings/.Settings")
+format_factory_test = _status_formatter("Factory Test command executed", "adb shell am start -n com.ubx.factorykit/.Framework.Framework")
+format_text = _status_formatter("Text entered.", "adb shell input text <TEXT>")
+
+
+def format_push(output: str) -> str:
+    if no_device(output):
+        return "No devices connected!"
+    if _FAILED_RE.search(output):
+        return "Push failed. Check the local and device paths.\n\n" + clean(output)
+    return f"File pushed successfully:\n{clean(output)}{_SUF_PUSH}"
+
+
+def format_storage(output: str) -> str:
+    if no_device(output):
+        return "No devices connected!"
+    return f"Device Storage:\n{clean(output)}{_SUF_STORAGE}"
+
+
+def format_pull(output: str) -> str:
+    if no_device(output):
+        return "No devices connected!"
+    if _FAILED_RE.search(output):
+        return "Pull failed. Check the device and local paths.\n\n" + clean(output)
+    return f"File pulled successfully:\n{clean(output)}{_SUF_PULL}"
+
+
+def format_screenshot(output: str) -> str:
+    if no_device(output):
+        return "No devices connected!"
+    if _FAILED_RE.search(output):
+        return "Screenshot failed. Check the device state.\n\n" + clean(output)
+    return (
+        f"Screenshot saved on device under /sdcard/Pictures/Screenshot_*.png\n"
+        "You may pull it to your Mac with adb pull.\n\n"
+        "Command run: \"adb shell screencap -p /sdcard/Pictures/<Screenshot_Timestamp>.png\""
+    )
+
+
+def format_network(output: str) -> str:
+    if no_device(output):
+        return "No devices connected!"
+    if not output.strip():
+        return "Network check returned no output. Device might be offline or command unsupported."
+    return f"Network configuration:\n{clean(output)}{_SUF_NETWORK}"
+
+
+def format_activity(output: str) -> str:
+    if no_device(output):
+        return "No devices connected!"
+    # mResumedActivity on older releases, ResumedActivity / topResumedActivity on newer ones
+    activity = _RE_ACTIVITY.search(output)
+    if activity:
+        return f"Current activity:\n{activity[1]}{_SUF_ACTIVITY}"
+    return "No current activity found. Output:\n" + clean(output)
+
+
+def format_scrcpy(output: str) -> str:
+    if _ERROR_RE.search(output):
+        return "No devices connected!"
+    return "CASTING started in the BACKGROUND"
+
+
+def format_command(output: str) -> str:
+    if no_device(output):
+        return "No devices connected!"
+    return clean(output)
+
+
+def format_start_activity(output: str) -> str:
+    if no_device(output):
+        return "No devices connected!"
+    if "Error" in output or _NOT_FOUND_RE.search(output):
+        return "Failed to start activity. Check the package/activity name.\n\n" + clean(output)
+    return f"Activity started (or adb returned output):\n{clean(output)}{_SUF_START_ACTIVITY}"